@@ -0,0 +1,38 @@
+"""
+Times BackTester over growing numbers of trading days.
+
+Seconds per day should stay flat as the number of days grows, any growth
+means something in the backtest loop is accumulating quadratically.
+
+    python -m benchmarks.bench_backtest_scaling --engine array
+"""
+import argparse
+import contextlib
+import io
+from time import perf_counter
+
+from simple_backtester.synthetic import random_strategy
+from simple_backtester.backtester import BackTester, Engine
+
+
+def time_backtest(num_days: int, engine: Engine, num_stocks: int) -> float:
+    strat = random_strategy(0, num_days, 4 * num_stocks, num_stocks)
+    start = perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        BackTester(strat, 10000.00, engine=engine)
+    return perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--engine", default="array", choices=[e.value for e in Engine])
+    parser.add_argument("--num-stocks", type=int, default=10)
+    parser.add_argument(
+        "--days", type=int, nargs="+", default=[250, 500, 1000, 2000, 4000]
+    )
+    args = parser.parse_args()
+
+    print(f"{'days':>8} {'seconds':>10} {'ms/day':>8}")
+    for num_days in args.days:
+        seconds = time_backtest(num_days, Engine(args.engine), args.num_stocks)
+        print(f"{num_days:>8} {seconds:>10.3f} {1000 * seconds / num_days:>8.3f}")
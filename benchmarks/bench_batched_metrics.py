@@ -0,0 +1,38 @@
+"""
+Times compute_all on a (days, runs) matrix against one call per run.
+
+    python -m benchmarks.bench_batched_metrics --runs 1000 --days 2520
+"""
+import argparse
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+from simple_backtester.metrics import compute_all
+
+
+def random_totals(num_days: int, num_runs: int) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    returns = rng.normal(0.0005, 0.01, (num_days, num_runs))
+    return 10000 * np.cumprod(1 + returns, axis=0)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=2520)
+    args = parser.parse_args()
+    totals = random_totals(args.days, args.runs)
+    dates = pd.bdate_range("2000-01-03", periods=args.days).values
+
+    start = perf_counter()
+    compute_all(totals, dates)
+    batched = perf_counter() - start
+
+    start = perf_counter()
+    for run in range(args.runs):
+        compute_all(totals[:, run], dates)
+    looped = perf_counter() - start
+
+    print(f"batched {batched:.3f}s  per run {looped:.3f}s  ({args.runs} runs)")
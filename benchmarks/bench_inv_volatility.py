@@ -0,0 +1,55 @@
+"""
+Times the rolling inverse volatility against the per window rolling apply.
+
+Uses data/nasdaq_backtest.csv when it is there, otherwise random prices.
+
+    python -m benchmarks.bench_inv_volatility --window 20
+"""
+import argparse
+import os
+from time import perf_counter
+
+import pandas as pd
+
+from momentum_strategy.momentum_strategy import (
+    _inv_volatility,
+    _rolling_groupby,
+    _rolling_inv_volatility,
+)
+from simple_backtester.synthetic import random_prices
+
+NASDAQ_CSV = "data/nasdaq_backtest.csv"
+
+
+def load_prices(num_days: int, num_symbols: int) -> pd.DataFrame:
+    if os.path.exists(NASDAQ_CSV):
+        prices = pd.read_csv(NASDAQ_CSV)
+        prices["date"] = pd.to_datetime(prices.date)
+        return prices.sort_values(by="date").reset_index(drop=True)
+    return random_prices(0, num_days, num_symbols)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--window", type=int, default=20)
+    parser.add_argument("--days", type=int, default=750)
+    parser.add_argument("--num-symbols", type=int, default=200)
+    args = parser.parse_args()
+
+    prices = load_prices(args.days, args.num_symbols)
+    print(f"{len(prices)} rows, {prices.symbol.nunique()} symbols")
+
+    start = perf_counter()
+    expected = _rolling_groupby(prices, _inv_volatility, args.window)
+    apply_seconds = perf_counter() - start
+
+    start = perf_counter()
+    actual = _rolling_inv_volatility(prices, args.window)
+    vectorized_seconds = perf_counter() - start
+
+    pd.testing.assert_series_equal(
+        actual, expected.reindex(prices.index), check_names=False
+    )
+    print(f"rolling apply {apply_seconds:>8.3f}s")
+    print(f"vectorized    {vectorized_seconds:>8.3f}s")
+    print(f"speedup       {apply_seconds / vectorized_seconds:>8.1f}x")
@@ -0,0 +1,49 @@
+"""
+Times the momentum and volatility signals computed serially against a process
+pool.
+
+    python -m benchmarks.bench_signal_executor --workers 4
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+
+import numpy as np
+
+import momentum_strategy.momentum_strategy as momentum_strategy
+from simple_backtester.synthetic import random_prices
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=750)
+    parser.add_argument("--num-symbols", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    prices = random_prices(0, args.days, args.num_symbols)
+    df, order, position = momentum_strategy._strategy_order(prices)
+    closes = df.close.values.astype(np.float64)[order]
+    signals = [("momentum", 90), ("inv_volatility", 20)]
+    print(f"{len(closes)} rows, {args.num_symbols} symbols")
+
+    start = perf_counter()
+    serial = momentum_strategy._compute_signals(closes, position, signals)
+    serial_seconds = perf_counter() - start
+
+    # inputs of every size go to the pool, it is only skipped with one CPU.
+    momentum_strategy._MIN_PARALLEL_ROWS = 0
+    with ProcessPoolExecutor(args.workers) as executor:
+        executor.submit(int).result()  # start the workers before timing.
+        workers = momentum_strategy._num_workers(executor)
+        start = perf_counter()
+        parallel = momentum_strategy._compute_signals(
+            closes, position, signals, executor
+        )
+        parallel_seconds = perf_counter() - start
+
+    for expected, actual in zip(serial, parallel):
+        np.testing.assert_array_equal(actual, expected)
+    print(f"serial            {serial_seconds:>8.3f}s")
+    print(f"{workers:>2} workers        {parallel_seconds:>8.3f}s")
+    print(f"speedup           {serial_seconds / parallel_seconds:>8.1f}x")
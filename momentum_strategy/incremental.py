@@ -0,0 +1,156 @@
+from typing import Callable, Dict, List, Optional, Tuple
+import pandas as pd
+import numpy as np
+from datetime import datetime
+
+import momentum_strategy.wide as wide
+from simple_backtester.actions import Action
+from momentum_strategy.momentum_strategy import (
+    _inv_volatility_scores,
+    _momentum_scores,
+)
+
+
+class IncrementalMomentumStrategy:
+    """
+    execute_momentum_strategy fed one trading day of prices at a time.
+
+    Every symbol keeps its last closes and the strategy keeps yesterday's
+    holdings, so on_day costs O(symbols x window) and returns only the new
+    day's strategy rows.  Feeding prices day by day gives the same rows as
+    execute_momentum_strategy over the whole history.
+    """
+
+    def __init__(
+        self,
+        momentum_window: int = 30,
+        volatility_window: int = 20,
+        num_stocks: int = 2,
+        drawdown_threshold: float = 0.2,
+        max_weight: Optional[float] = None,
+        cash_reserve: float = 0.0,
+    ):
+        self.momentum_window = momentum_window
+        self.volatility_window = volatility_window
+        self.num_stocks = num_stocks
+        self.drawdown_threshold = drawdown_threshold
+        self.max_weight = max_weight
+        self.cash_reserve = cash_reserve
+
+        self.symbol_ids: Dict[str, int] = {}
+        self.symbols: List[str] = []
+        self.last_date: Optional[datetime] = None
+        # per symbol, oldest close first.  NaN until a symbol has enough rows.
+        self.closes = np.full((0, max(momentum_window, volatility_window)), np.nan)
+        self.num_closes = np.zeros(0, dtype=np.int64)
+        # yesterday's holdings, their ranks and the values a sell carries over.
+        self.held = np.zeros(0, dtype=bool)
+        self.ranks = np.zeros(0, dtype=np.int64)
+        self.last_signals = np.full((0, 3), np.nan)  # close, momentum, inv vol.
+
+    def on_day(self, day_df: pd.DataFrame) -> pd.DataFrame:
+        day = day_df.date.iloc[0]
+        if (day_df.date != day).any():
+            raise ValueError("on_day takes the prices of a single date.")
+        if self.last_date is not None and day <= self.last_date:
+            raise ValueError(f"{day} is not after {self.last_date}.")
+        self.last_date = day
+
+        df = day_df.reset_index(drop=True)
+        ids = self._symbol_ids(df.symbol)
+        self.closes[ids, :-1] = self.closes[ids, 1:]
+        self.closes[ids, -1] = df.close.values
+        self.num_closes[ids] += 1
+        df["momentum"], df["inv_volatility"] = self._signals(ids)
+
+        num_symbols = len(self.symbols)
+        momentum = np.full((1, num_symbols), np.nan)
+        momentum[0, ids] = df.momentum.values
+        inv_volatility = np.full((1, num_symbols), np.nan)
+        inv_volatility[0, ids] = df.inv_volatility.values
+        rows = np.full((1, num_symbols), -1)
+        rows[0, ids] = np.arange(len(df))
+        eligible = ~np.isnan(momentum) & ~np.isnan(inv_volatility)
+        if not eligible.any():  # not a trading day for the strategy yet.
+            return _strategy_rows(df, [])
+
+        ranks = wide.top_ranks(momentum, eligible, rows, self.num_stocks)
+        actions, carried_sells = wide.action_matrix(
+            momentum,
+            ranks,
+            self.num_stocks,
+            self.drawdown_threshold,
+            first_held=self.held,
+        )
+        weights = wide.weight_matrix(
+            inv_volatility, actions, self.max_weight, self.cash_reserve
+        )
+
+        sold = np.flatnonzero(carried_sells[0])
+        sold = sold[np.argsort(self.ranks[sold], kind="stable")]
+        sells = pd.DataFrame(
+            {
+                "symbol": np.asarray(self.symbols, dtype=object)[sold],
+                "close": self.last_signals[sold, 0],
+                "momentum": self.last_signals[sold, 1],
+                "inv_volatility": self.last_signals[sold, 2],
+                "date": day,
+                "action": wide.SELL,
+                "weight": np.nan,
+            }
+        )
+        top = np.flatnonzero(actions[0] > wide.NO_ACTION)
+        top = top[np.argsort(ranks[0, top], kind="stable")]
+        picks = df.iloc[rows[0, top]].assign(action=actions[0, top])
+        picks["weight"] = weights[0, top]
+
+        self.held = (actions[0] == wide.HOLD) | (actions[0] == wide.BUY)
+        self.ranks = ranks[0]
+        self.last_signals[ids] = df[["close", "momentum", "inv_volatility"]].values
+        return _strategy_rows(df, [sells, picks])
+
+    def _symbol_ids(self, symbols: pd.Series) -> np.ndarray:
+        for symbol in symbols:
+            if symbol not in self.symbol_ids:
+                self.symbol_ids[symbol] = len(self.symbols)
+                self.symbols.append(symbol)
+        new = len(self.symbols) - len(self.held)
+        if new:
+            self.closes = np.vstack(
+                [self.closes, np.full((new, self.closes.shape[1]), np.nan)]
+            )
+            self.num_closes = np.append(self.num_closes, np.zeros(new, np.int64))
+            self.held = np.append(self.held, np.zeros(new, dtype=bool))
+            self.ranks = np.append(self.ranks, np.full(new, wide.UNRANKED))
+            self.last_signals = np.vstack(
+                [self.last_signals, np.full((new, 3), np.nan)]
+            )
+        return np.array([self.symbol_ids[symbol] for symbol in symbols], np.int64)
+
+    def _signals(self, ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # each symbol's window is the last rows of its closes, laid out one
+        # symbol after another like the full history.
+        return (
+            self._last_score(_momentum_scores, ids, self.momentum_window),
+            self._last_score(_inv_volatility_scores, ids, self.volatility_window),
+        )
+
+    def _last_score(self, scores: Callable, ids: np.ndarray, window: int) -> np.ndarray:
+        if len(ids) == 0:
+            return np.empty(0)
+        windows = self.closes[ids, -window:]
+        position = self.num_closes[ids, None] - window + np.arange(window)
+        all_scores = scores(windows.ravel(), position.ravel(), window)
+        return all_scores.reshape(-1, window)[:, -1]
+
+
+def _strategy_rows(df: pd.DataFrame, frames: List[pd.DataFrame]) -> pd.DataFrame:
+    columns = list(df.columns) + ["action", "weight"]
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    rows = pd.concat(frames, ignore_index=True)[columns]
+    rows["action"] = rows.action.map(_ACTIONS)
+    return rows
+
+
+_ACTIONS = {wide.HOLD: Action.hold, wide.SELL: Action.sell, wide.BUY: Action.buy}
@@ -1,9 +1,16 @@
+import os
+import tempfile
 import pandas as pd
-from typing import Union, Callable
+from concurrent.futures import Executor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
 from simple_backtester.backtester import Action
+from simple_backtester.engine import StrategyArrays
 import numpy as np
 from scipy import stats
 
+import momentum_strategy.wide as wide
+from momentum_strategy.signal_cache import SignalCache
+
 
 def _momentum_score(ts: Union[pd.Series, np.ndarray]) -> float:
     # something to tweak here, the num of trading days
@@ -31,82 +38,420 @@ def _rolling_groupby(df: pd.DataFrame, roll_func: Callable, window: int) -> pd.S
     )
 
 
+# rolling sums are taken from prefix sums restarted every _BLOCK rows, which
+# keeps them as accurate as summing each window on its own.
+_BLOCK = 256
+_TRADING_DAYS = 252
+
+
+def _strategy_order(df: pd.DataFrame) -> Tuple[pd.DataFrame, np.ndarray, np.ndarray]:
+    # prices in date order, plus the symbol order of those rows.
+    df = df.sort_values(by="date").reset_index(drop=True)
+    order, position = _symbol_order(df)
+    return df, order, position
+
+
+def _symbol_order(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    # row order that groups symbols like groupby("symbol") does, and every
+    # row's position within its symbol.
+    codes, _ = pd.factorize(df.symbol, sort=True)
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    starts = np.concatenate([[0], np.flatnonzero(np.diff(sorted_codes)) + 1])
+    sizes = np.diff(np.concatenate([starts, [len(codes)]]))
+    return order, np.arange(len(codes)) - np.repeat(starts, sizes)
+
+
+class _BlockPrefixSums:
+    """
+    Prefix sums over blocks of _BLOCK rows that overlap by max_window - 1 rows.
+
+    Any window up to max_window rows long ending in a block is the difference
+    of two of its prefix sums.  Each block is re-anchored on its own first
+    value so the sums stay small however long the history is.
+    """
+
+    def __init__(self, values: np.ndarray, max_window: int, anchor: bool = False):
+        self.length = len(values)
+        self.max_window = max_window
+        padded = np.concatenate(
+            [np.zeros(max_window - 1), values, np.zeros(-len(values) % _BLOCK)]
+        )
+        num_blocks = -(-len(values) // _BLOCK)
+        rows = np.arange(num_blocks)[:, None] * _BLOCK
+        self.blocks = padded[rows + np.arange(_BLOCK + max_window - 1)]
+        if anchor:
+            self.blocks = self.blocks - self.blocks[:, [max_window - 1]]
+
+    def prefix(self, blocks: np.ndarray) -> np.ndarray:
+        return np.concatenate(
+            [np.zeros((len(blocks), 1)), np.cumsum(blocks, axis=1)], axis=1
+        )
+
+    def window_sums(self, prefix: np.ndarray, window: int) -> np.ndarray:
+        end = self.max_window + np.arange(_BLOCK)
+        return prefix[:, end] - prefix[:, end - window]
+
+    def flatten(self, block_values: np.ndarray) -> np.ndarray:
+        return block_values.ravel()[: self.length]
+
+
+def _unsort(order: np.ndarray, values: np.ndarray) -> np.ndarray:
+    # values of the symbol sorted rows back in the frame's row order.
+    unsorted = np.empty(len(values))
+    unsorted[order] = values
+    return unsorted
+
+
+def _rolling_momentum(df: pd.DataFrame, window: int) -> pd.Series:
+    """_rolling_groupby(df, _momentum_score, window) for every symbol at once."""
+    order, position = _symbol_order(df)
+    closes = df.close.values.astype(np.float64)[order]
+    momentum = _momentum_scores(closes, position, window)
+    return pd.Series(_unsort(order, momentum), index=df.index)
+
+
+def _rolling_inv_volatility(df: pd.DataFrame, window: int) -> pd.Series:
+    """_rolling_groupby(df, _inv_volatility, window) for every symbol at once."""
+    order, position = _symbol_order(df)
+    closes = df.close.values.astype(np.float64)[order]
+    inv_volatility = _inv_volatility_scores(closes, position, window)
+    return pd.Series(_unsort(order, inv_volatility), index=df.index)
+
+
+def _momentum_scores(
+    closes: np.ndarray, position: np.ndarray, window: int
+) -> np.ndarray:
+    return _multi_momentum_scores(closes, position, [window])[0]
+
+
+def _inv_volatility_scores(
+    closes: np.ndarray, position: np.ndarray, window: int
+) -> np.ndarray:
+    return _multi_inv_volatility_scores(closes, position, [window])[0]
+
+
+def _multi_momentum_scores(
+    closes: np.ndarray, position: np.ndarray, windows: Sequence[int]
+) -> List[np.ndarray]:
+    """
+    Rolling _momentum_score of closes grouped by symbol, one array per window.
+
+    position is each close's position within its symbol.  Slope and r of the
+    log close on the day number come from rolling sums of y, x * y and y ** 2.
+    All windows share one set of prefix sums, so every extra window is O(n).
+    Windows holding a close <= 0 score -10 and windows holding a NaN close are
+    NaN, just like the rolling apply.
+    """
+    invalid = np.isnan(closes)
+    non_positive = ~invalid & (closes <= 0)
+    log_closes = np.log(np.where(invalid | non_positive, 1.0, closes))
+
+    sums = _BlockPrefixSums(log_closes, max(windows), anchor=True)
+    day = np.arange(sums.blocks.shape[1])
+    y_prefix = sums.prefix(sums.blocks)
+    xy_prefix = sums.prefix(day * sums.blocks)
+    yy_prefix = sums.prefix(sums.blocks ** 2)
+    non_positive_counts = _rolling_counts(non_positive, windows)
+    invalid_counts = _rolling_counts(invalid, windows)
+
+    all_scores = []
+    for i, window in enumerate(windows):
+        y_sum = sums.window_sums(y_prefix, window)
+        xy_sum = sums.window_sums(xy_prefix, window)
+        yy_sum = sums.window_sums(yy_prefix, window)
+
+        # centered sums of squares, x is the day number within the window.
+        first_day = sums.max_window - window + np.arange(_BLOCK)
+        x_sum = window * (window - 1) / 2
+        ssxm = window * (window ** 2 - 1) / 12
+        ssxym = (xy_sum - first_day * y_sum) - x_sum * y_sum / window
+        ssym = yy_sum - y_sum * y_sum / window
+        slope = ssxym / ssxm
+        with np.errstate(divide="ignore", invalid="ignore"):
+            r_squared = np.where(
+                ssym > 0, np.minimum(ssxym ** 2 / (ssxm * ssym), 1), 0
+            )
+        annualized_slope = (np.power(np.exp(slope), _TRADING_DAYS) - 1) * 100
+        scores = sums.flatten(np.round(annualized_slope * r_squared, 3))
+
+        scores[non_positive_counts[i] > 0] = -10
+        scores[invalid_counts[i] > 0] = np.nan
+        scores[position < window - 1] = np.nan
+        all_scores.append(scores)
+    return all_scores
+
+
+def _multi_inv_volatility_scores(
+    closes: np.ndarray, position: np.ndarray, windows: Sequence[int]
+) -> List[np.ndarray]:
+    """
+    Rolling _inv_volatility of closes grouped by symbol, one array per window.
+
+    Returns are taken once over all the closes and window - 1 of them cover
+    the same closes as each window.  Their std comes from rolling sums of r
+    and r ** 2 sharing one set of prefix sums.  Windows holding a NaN close,
+    a non finite return or reaching into the previous symbol are NaN.
+    """
+    returns = pd.Series(closes).pct_change(fill_method="ffill").values
+    bad_returns = ~np.isfinite(returns) & (position > 0)
+    returns = np.where(np.isfinite(returns), returns, 0.0)
+
+    max_returns = max(max(windows) - 1, 1)
+    sums = _BlockPrefixSums(returns, max_returns, anchor=True)
+    r_prefix = sums.prefix(sums.blocks)
+    rr_prefix = sums.prefix(sums.blocks ** 2)
+    nan_counts = _rolling_counts(np.isnan(closes), windows)
+    bad_counts = _rolling_counts(bad_returns, [max(w - 1, 1) for w in windows])
+
+    all_scores = []
+    for i, window in enumerate(windows):
+        num_returns = window - 1
+        if num_returns < 2:  # the std of a single return is NaN.
+            all_scores.append(np.full(len(closes), np.nan))
+            continue
+        r_sum = sums.flatten(sums.window_sums(r_prefix, num_returns))
+        rr_sum = sums.flatten(sums.window_sums(rr_prefix, num_returns))
+        variance = np.maximum(rr_sum - r_sum * r_sum / num_returns, 0)
+        with np.errstate(divide="ignore"):
+            scores = 1 / np.sqrt(variance / (num_returns - 1))
+
+        scores[(nan_counts[i] > 0) | (bad_counts[i] > 0)] = np.nan
+        scores[position < window - 1] = np.nan
+        all_scores.append(scores)
+    return all_scores
+
+
+def _rolling_counts(flags: np.ndarray, windows: Sequence[int]) -> List[np.ndarray]:
+    counts = _BlockPrefixSums(flags.astype(np.float64), max(windows))
+    prefix = counts.prefix(counts.blocks)
+    return [counts.flatten(counts.window_sums(prefix, w)) for w in windows]
+
+
+# symbols per signal chunk.  Chunks are the same with or without an executor,
+# so both paths sum the exact same blocks.  A task runs one worker's share of
+# consecutive chunks, and inputs under _MIN_PARALLEL_ROWS closes are computed
+# in process, where they are faster than the pool's start up and pickling.
+_SYMBOLS_PER_CHUNK = 32
+_MIN_PARALLEL_ROWS = 100_000
+
+# (name, window) of a signal column.
+Signal = Tuple[str, int]
+
+
+def _symbol_signals(
+    closes: np.ndarray,
+    position: np.ndarray,
+    momentum_window: int,
+    volatility_window: int,
+    executor: Optional[Executor] = None,
+    cache: Optional[SignalCache] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Rolling momentum and inverse volatility of closes grouped by symbol."""
+    momentum, inv_volatility = _compute_signals(
+        closes,
+        position,
+        [("momentum", momentum_window), ("inv_volatility", volatility_window)],
+        executor,
+        cache,
+    )
+    return momentum, inv_volatility
+
+
+def _compute_signals(
+    closes: np.ndarray,
+    position: np.ndarray,
+    signals: List[Signal],
+    executor: Optional[Executor] = None,
+    cache: Optional[SignalCache] = None,
+) -> List[np.ndarray]:
+    """
+    Signal columns of closes grouped by symbol, position is each close's
+    position within its symbol.
+
+    Signals found in cache are loaded, the others are computed and saved.
+    The symbols are split into chunks of _SYMBOLS_PER_CHUNK.  With an executor
+    of several workers the chunks are split into one task per worker, each
+    reading its closes from a memory mapped .npy file, so only row bounds and
+    the resulting arrays are pickled, and results are stitched back together
+    in chunk order.
+    """
+    fingerprint = "" if cache is None else cache.fingerprint(closes, position)
+    columns = {}
+    if cache is not None:
+        for signal in signals:
+            values = cache.load(fingerprint, *signal)
+            if values is not None:
+                columns[signal] = values
+    missing = [signal for signal in signals if signal not in columns]
+    if not missing:
+        return [columns[signal] for signal in signals]
+
+    symbol_starts = np.flatnonzero(position == 0)
+    bounds = np.append(symbol_starts[::_SYMBOLS_PER_CHUNK], len(closes))
+    chunks = list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+    workers = 1 if executor is None else _num_workers(executor)
+    if executor is None or workers == 1 or len(closes) < _MIN_PARALLEL_ROWS:
+        results = [
+            _chunk_signals(closes[start:stop], position[start:stop], missing)
+            for start, stop in chunks
+        ]
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            np.save(os.path.join(directory, "closes.npy"), closes)
+            np.save(os.path.join(directory, "position.npy"), position)
+            futures = [
+                executor.submit(_signal_task, directory, chunks[task], missing)
+                for task in _task_slices(len(chunks), workers)
+            ]
+            results = [result for future in futures for result in future.result()]
+
+    for i, signal in enumerate(missing):
+        columns[signal] = np.concatenate(
+            [result[i] for result in results] or [np.empty(0)]
+        )
+        if cache is not None:
+            cache.save(fingerprint, *signal, columns[signal])
+    return [columns[signal] for signal in signals]
+
+
+def _num_workers(executor: Executor) -> int:
+    # process and thread pools keep their size in _max_workers, workers past
+    # the number of CPUs only take turns.
+    cpus = os.cpu_count() or 1
+    return min(getattr(executor, "_max_workers", cpus), cpus)
+
+
+def _task_slices(num_chunks: int, workers: int) -> List[slice]:
+    # consecutive chunks split as evenly as possible into at most workers tasks.
+    bounds = np.linspace(0, num_chunks, min(workers, num_chunks) + 1).astype(int)
+    return [slice(start, stop) for start, stop in zip(bounds[:-1], bounds[1:])]
+
+
+def _signal_task(
+    directory: str, chunks: List[Tuple[int, int]], signals: List[Signal]
+) -> List[List[np.ndarray]]:
+    closes = np.load(os.path.join(directory, "closes.npy"), mmap_mode="r")
+    position = np.load(os.path.join(directory, "position.npy"), mmap_mode="r")
+    return [
+        _chunk_signals(
+            np.array(closes[start:stop]), np.array(position[start:stop]), signals
+        )
+        for start, stop in chunks
+    ]
+
+
+def _chunk_signals(
+    closes: np.ndarray, position: np.ndarray, signals: List[Signal]
+) -> List[np.ndarray]:
+    # every kind of signal is one kernel call over all of its windows.
+    kernels = {
+        "momentum": _multi_momentum_scores,
+        "inv_volatility": _multi_inv_volatility_scores,
+    }
+    columns: Dict[Signal, np.ndarray] = {}
+    for name, kernel in kernels.items():
+        windows = [window for kind, window in signals if kind == name]
+        if windows:
+            columns.update(
+                zip(
+                    [(name, window) for window in windows],
+                    kernel(closes, position, windows),
+                )
+            )
+    return [columns[signal] for signal in signals]
+
+
+def multi_window_signals(
+    df: pd.DataFrame,
+    momentum_windows: Sequence[int] = (),
+    volatility_windows: Sequence[int] = (),
+    executor: Optional[Executor] = None,
+    cache: Optional[SignalCache] = None,
+) -> pd.DataFrame:
+    """
+    Rolling momentum and inverse volatility of df for several windows at once.
+
+    Returns one momentum_{window} and inv_volatility_{window} column per
+    window, indexed like df.  The windows of a signal share a single pass of
+    prefix sums, so every extra window costs O(n) instead of a full rolling
+    apply.
+    """
+    signals = [("momentum", w) for w in momentum_windows] + [
+        ("inv_volatility", w) for w in volatility_windows
+    ]
+    # the same date sorted closes as execute_momentum_strategy, so both share
+    # cache entries, and the df row of every sorted row.
+    rows = df.reset_index(drop=True).sort_values(by="date").index.values
+    sorted_df, order, position = _strategy_order(df)
+    closes = sorted_df.close.values.astype(np.float64)[order]
+    columns = _compute_signals(closes, position, signals, executor, cache)
+
+    signal_df = pd.DataFrame(index=df.index)
+    for (name, window), values in zip(signals, columns):
+        signal_df[f"{name}_{window}"] = _unsort(rows, _unsort(order, values))
+    return signal_df
+
+
+def warm_signal_cache(
+    df: pd.DataFrame, cache: SignalCache, signals: List[Signal]
+) -> None:
+    """Compute and cache signals the way execute_momentum_strategy reads them."""
+    df, order, position = _strategy_order(df)
+    _compute_signals(
+        df.close.values.astype(np.float64)[order], position, signals, cache=cache
+    )
+
+
 def _apply_actions(
     df: pd.DataFrame, num_stocks: int, drawdown_threshold: float = 0.2
 ) -> pd.DataFrame:
+    """
+    Buy, hold and sell the top num_stocks names by momentum every day.
+
+    Top N membership comes from the date x symbol momentum matrix, holds and
+    buys are the names that were or were not held the day before and names
+    that fell out of the top N are sold at the previous day's close.  Names
+    under drawdown_threshold are sold if held and not bought (NaN action).
+    """
     # ASSUME DF is in ascending date order.
-    df = df.dropna(subset=["momentum", "inv_volatility"])
-
-    action_df = pd.DataFrame()
-    for i, daily_df in df.groupby("date"):
-        if i == df.date.min():  # its the first day!
-            sorted_df = (
-                daily_df.sort_values(by="momentum", ascending=False)
-                .reset_index(drop=True)
-                .loc[: num_stocks - 1]
-            )
-            sorted_df["action"] = Action.buy
+    df = df.dropna(subset=["momentum", "inv_volatility"]).reset_index(drop=True)
+    prices = wide.pivot_prices(df)
+    momentum = wide.from_long(prices, df.momentum.values)
+    ranks = wide.top_ranks(momentum, prices.valid, prices.rows, num_stocks)
+    actions, carried_sells = wide.action_matrix(
+        momentum, ranks, num_stocks, drawdown_threshold
+    )
+    return wide.to_strategy_frame(
+        df, prices, actions, carried_sells, ranks, keep_skipped=True
+    )
 
-            # day 1 drawdown protection
-            sorted_df.loc[sorted_df.momentum < drawdown_threshold, "action"] = np.nan
-            action_df = pd.concat([action_df, sorted_df])
 
-        else:  # a previous day exists.
-            sorted_df = (
-                daily_df.sort_values(by="momentum", ascending=False)
-                .reset_index(drop=True)
-                .loc[: num_stocks - 1]
-            )
-            previous_day = action_df.query(
-                "date == date.max() and action != @Action.sell and action"
-            )
+def _apply_weights(
+    action_df: pd.DataFrame,
+    max_weight: Optional[float] = None,
+    cash_reserve: float = 0.0,
+) -> pd.Series:
+    """
+    Inverse volatility weights of the non sell rows of each day, NaN for sells.
 
-            # buys and holds
-            for j, row in sorted_df.iterrows():
-                if row.symbol in previous_day.symbol.values:
-                    sorted_df.at[j, "action"] = Action.hold
-                else:
-                    sorted_df.at[j, "action"] = Action.buy
-
-            # Drawdown Protection:  revert holds and buys if needed.
-            sorted_df.at[
-                (sorted_df.momentum < drawdown_threshold)
-                & (sorted_df.action == Action.hold),
-                "action",
-            ] = Action.sell
-
-            sorted_df.at[
-                (sorted_df.momentum < drawdown_threshold)
-                & (sorted_df.action == Action.buy),
-                "action",
-            ] = np.nan
-
-            # Sells
-
-            for _, row in previous_day.iterrows():
-                if row.symbol not in sorted_df.symbol.values:
-                    sell_row = pd.DataFrame(
-                        [
-                            {
-                                "symbol": row.symbol,
-                                "action": Action.sell,
-                                "close": row.close,
-                                "momentum": row.momentum,
-                                "inv_volatility": row.inv_volatility,
-                                "date": sorted_df.at[0, "date"],
-                            }
-                        ]
-                    )
-                    action_df = action_df.append(sell_row, ignore_index=True)
-            action_df = pd.concat([action_df, sorted_df]).reset_index(drop=True)
-    return action_df
-
-
-def _apply_weights(action_df: pd.DataFrame) -> pd.Series:
-    return (
-        action_df.query("action != @Action.sell")
-        .groupby("date")["inv_volatility"]
-        .apply(lambda x: x / x.sum())
+    The result lines up row for row with action_df.  cash_reserve is the
+    fraction of the total left in cash and no name is weighted over
+    max_weight, whatever is cut off stays in cash too.
+    """
+    weighted = (action_df.action != Action.sell).values
+    inv_volatility = action_df.inv_volatility.values.astype(np.float64)
+    day_ids, _ = pd.factorize(action_df.date)
+    day_totals = np.bincount(
+        day_ids, weights=np.where(weighted, np.nan_to_num(inv_volatility), 0.0)
+    )
+    weights = inv_volatility / day_totals[day_ids]
+    if cash_reserve:
+        weights = weights * (1 - cash_reserve)
+    if max_weight is not None:
+        weights = np.minimum(weights, max_weight)
+    return pd.Series(
+        np.where(weighted, weights, np.nan), index=action_df.index, name="weight"
     )
 
 
@@ -115,6 +460,10 @@ def execute_momentum_strategy(
     momentum_window: int = 30,
     volatility_window: int = 20,
     num_stocks: int = 2,
+    max_weight: Optional[float] = None,
+    cash_reserve: float = 0.0,
+    executor: Optional[Executor] = None,
+    cache: Optional[SignalCache] = None,
 ):
     """
     This strategy uses simple momentum to make stock transactions.
@@ -122,28 +471,179 @@ def execute_momentum_strategy(
     This algorithm will run daily.  We will choose the top N
     stocks momentum-wise and rebalance every time.  This class takes a DataFrame
     of prices, dates and symbols and adds Actions and ownership weights.
+
+    Momentum and volatility are computed per chunk of symbols, on executor
+    (e.g. a ProcessPoolExecutor) when one is given.  The result is identical
+    either way.  With a cache, signals already computed for the same prices
+    and windows are read back from disk.
     """
-    # Thread out on the groupbys.. maybe a different workflow.
-    # Group by to calc momentum and volatility all at once
-    # (thread out the groups by symbol)
-    # then apply actions. (cant be threaded.)
-    # then thread out to apply weights per day.
+    # Actions cant be threaded, every day depends on the one before.
 
     # assert that date is a datetime dtype.
     if df.date.dtype != np.dtype("datetime64[ns]"):
         print("date column needs to be datetime type.")
         raise ValueError
 
-    df = df.sort_values(by="date").reset_index(drop=True)
-    print("Calculating Momentum")
-    df["momentum"] = _rolling_groupby(df, _momentum_score, momentum_window)
-    print("Calculating Inverse Volatility.")
-    df["inv_volatility"] = _rolling_groupby(df, _inv_volatility, volatility_window)
+    df, order, position = _strategy_order(df)
+    print("Calculating Momentum and Inverse Volatility.")
+    momentum, inv_volatility = _symbol_signals(
+        df.close.values.astype(np.float64)[order],
+        position,
+        momentum_window,
+        volatility_window,
+        executor,
+        cache,
+    )
+    df["momentum"] = _unsort(order, momentum)
+    df["inv_volatility"] = _unsort(order, inv_volatility)
     df.dropna(subset=["momentum"], inplace=True)
     print("Applying actions.")
     df = _apply_actions(df.copy(), num_stocks)
     df = df.dropna(subset=["action"]).reset_index(drop=True)
     print("Weighting actions.")
-    df["weight"] = _apply_weights(df.copy())
+    df["weight"] = _apply_weights(df, max_weight, cash_reserve)
     print("Completed Strategy Execution.")
     return df
+
+
+def execute_wide_momentum_strategy(
+    df: pd.DataFrame,
+    momentum_window: int = 30,
+    volatility_window: int = 20,
+    num_stocks: int = 2,
+    drawdown_threshold: float = 0.2,
+    max_weight: Optional[float] = None,
+    cash_reserve: float = 0.0,
+) -> pd.DataFrame:
+    """
+    execute_momentum_strategy on a dense date x symbol layout.
+
+    Prices are pivoted once and momentum, inverse volatility, ranking, actions
+    and weights are all computed on date x symbol matrices.  Only the result
+    goes back to the long strategy frame, so BackTester and other callers see
+    the same frame as from execute_momentum_strategy.
+    """
+    if df.date.dtype != np.dtype("datetime64[ns]"):
+        print("date column needs to be datetime type.")
+        raise ValueError
+
+    df = df.sort_values(by="date").reset_index(drop=True)
+    prices = wide.pivot_prices(df)
+    momentum, inv_volatility = _wide_signals(prices, momentum_window, volatility_window)
+    df["momentum"] = wide.to_long(prices, momentum)
+    df["inv_volatility"] = wide.to_long(prices, inv_volatility)
+
+    prices, momentum, inv_volatility = _trading_days(prices, momentum, inv_volatility)
+    actions, carried_sells, ranks, weights = _wide_actions(
+        prices,
+        momentum,
+        inv_volatility,
+        num_stocks,
+        drawdown_threshold,
+        max_weight,
+        cash_reserve,
+    )
+    return wide.to_strategy_frame(df, prices, actions, carried_sells, ranks, weights)
+
+
+def _wide_signals(
+    prices: wide.PriceMatrix,
+    momentum_window: int,
+    volatility_window: int,
+    executor: Optional[Executor] = None,
+    cache: Optional[SignalCache] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    closes, position = wide.symbol_columns(prices)
+    momentum, inv_volatility = _symbol_signals(
+        closes, position, momentum_window, volatility_window, executor, cache
+    )
+    return (
+        wide.from_symbol_columns(prices, momentum),
+        wide.from_symbol_columns(prices, inv_volatility),
+    )
+
+
+def _trading_days(
+    prices: wide.PriceMatrix, momentum: np.ndarray, inv_volatility: np.ndarray
+) -> Tuple[wide.PriceMatrix, np.ndarray, np.ndarray]:
+    # days without a single ranked name do not count as trading days.
+    eligible = ~np.isnan(momentum) & ~np.isnan(inv_volatility)
+    days = eligible.any(axis=1)
+    return prices.take_days(days), momentum[days], inv_volatility[days]
+
+
+def _wide_actions(
+    prices: wide.PriceMatrix,
+    momentum: np.ndarray,
+    inv_volatility: np.ndarray,
+    num_stocks: int,
+    drawdown_threshold: float,
+    max_weight: Optional[float],
+    cash_reserve: float,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    eligible = ~np.isnan(momentum) & ~np.isnan(inv_volatility)
+    ranks = wide.top_ranks(momentum, eligible, prices.rows, num_stocks)
+    actions, carried_sells = wide.action_matrix(
+        momentum, ranks, num_stocks, drawdown_threshold
+    )
+    weights = wide.weight_matrix(inv_volatility, actions, max_weight, cash_reserve)
+    return actions, carried_sells, ranks, weights
+
+
+class MomentumStrategy:
+    """
+    execute_momentum_strategy as a Strategy.
+
+    arrays runs the dense date x symbol path and hands the rows to BackTester
+    as StrategyArrays, so no strategy frame is built, sorted or validated on
+    the way.  The arrays hold the same rows as the frame of
+    execute_momentum_strategy with the same parameters.
+    """
+
+    def __init__(
+        self,
+        momentum_window: int = 30,
+        volatility_window: int = 20,
+        num_stocks: int = 2,
+        drawdown_threshold: float = 0.2,
+        max_weight: Optional[float] = None,
+        cash_reserve: float = 0.0,
+        executor: Optional[Executor] = None,
+        cache: Optional[SignalCache] = None,
+    ):
+        self.momentum_window = momentum_window
+        self.volatility_window = volatility_window
+        self.num_stocks = num_stocks
+        self.drawdown_threshold = drawdown_threshold
+        self.max_weight = max_weight
+        self.cash_reserve = cash_reserve
+        self.executor = executor
+        self.cache = cache
+
+    def arrays(self, prices: pd.DataFrame) -> StrategyArrays:
+        if prices.date.dtype != np.dtype("datetime64[ns]"):
+            raise ValueError("date column needs to be datetime type.")
+
+        price_matrix = wide.pivot_prices(prices.sort_values(by="date"))
+        momentum, inv_volatility = _wide_signals(
+            price_matrix,
+            self.momentum_window,
+            self.volatility_window,
+            self.executor,
+            self.cache,
+        )
+        price_matrix, momentum, inv_volatility = _trading_days(
+            price_matrix, momentum, inv_volatility
+        )
+        actions, carried_sells, ranks, weights = _wide_actions(
+            price_matrix,
+            momentum,
+            inv_volatility,
+            self.num_stocks,
+            self.drawdown_threshold,
+            self.max_weight,
+            self.cash_reserve,
+        )
+        return wide.to_strategy_arrays(
+            price_matrix, actions, carried_sells, ranks, weights
+        )
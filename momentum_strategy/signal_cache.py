@@ -0,0 +1,69 @@
+import os
+from typing import Optional
+import numpy as np
+
+from simple_backtester.checkpoint import checksum
+
+
+class SignalCache:
+    """
+    Signal columns memoized on disk, one .npy file per signal.
+
+    Entries are keyed by a fingerprint of the prices plus the signal name and
+    window, so changed prices never hit an old entry.  Reads touch the file,
+    and once the directory grows past max_bytes the least recently used files
+    are removed.  Files are written next to their final name and moved in
+    place, so processes of a sweep can share one directory.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 1 << 30):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def fingerprint(closes: np.ndarray, position: np.ndarray) -> str:
+        # signals only depend on the symbol sorted closes and their positions.
+        return checksum(closes, position)
+
+    def path(self, fingerprint: str, name: str, window: int) -> str:
+        return os.path.join(self.directory, f"{name}_{window}_{fingerprint}.npy")
+
+    def load(self, fingerprint: str, name: str, window: int) -> Optional[np.ndarray]:
+        path = self.path(fingerprint, name, window)
+        try:
+            values = np.load(path)
+            os.utime(path)
+        except FileNotFoundError:  # never written or evicted by another process.
+            self.misses += 1
+            return None
+        self.hits += 1
+        return values
+
+    def save(
+        self, fingerprint: str, name: str, window: int, values: np.ndarray
+    ) -> None:
+        path = self.path(fingerprint, name, window)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as fout:
+            np.save(fout, values)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self) -> None:
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".npy"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        size = sum(entry_size for _, entry_size, _ in entries)
+        for _, entry_size, path in sorted(entries):
+            if size <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            size -= entry_size
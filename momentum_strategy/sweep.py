@@ -0,0 +1,175 @@
+import os
+import itertools
+import pandas as pd
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+from momentum_strategy.momentum_strategy import (
+    Signal,
+    execute_momentum_strategy,
+    warm_signal_cache,
+)
+from momentum_strategy.signal_cache import SignalCache
+from simple_backtester.backtester import BackTester, Engine
+
+PARAMS = ["momentum_window", "volatility_window", "num_stocks"]
+
+
+class SharedPrices(NamedTuple):
+    """Paths of the memory mapped price columns, cheap to send to workers."""
+
+    directory: str
+
+    def path(self, column: str) -> str:
+        return os.path.join(self.directory, f"{column}.npy")
+
+
+def share_prices(prices: pd.DataFrame, directory: str) -> SharedPrices:
+    # write date/symbol/close once as flat .npy columns for np.load(mmap_mode="r")
+    os.makedirs(directory, exist_ok=True)
+    shared = SharedPrices(directory)
+    symbol_ids, symbols = pd.factorize(prices.symbol)
+    np.save(shared.path("date"), prices.date.values.astype("datetime64[ns]"))
+    np.save(shared.path("symbol_id"), symbol_ids.astype(np.int32))
+    np.save(shared.path("symbols"), np.asarray(symbols).astype(str))
+    np.save(shared.path("close"), prices.close.values.astype(np.float64))
+    return shared
+
+
+def load_shared_prices(shared: SharedPrices) -> pd.DataFrame:
+    symbols = np.load(shared.path("symbols"))
+    symbol_ids = np.load(shared.path("symbol_id"), mmap_mode="r")
+    return pd.DataFrame(
+        {
+            "date": np.load(shared.path("date"), mmap_mode="r"),
+            "symbol": symbols[symbol_ids],
+            "close": np.load(shared.path("close"), mmap_mode="r"),
+        }
+    )
+
+
+def parameter_grid(**param_lists: Sequence[int]) -> List[Dict[str, int]]:
+    keys = list(param_lists)
+    return [
+        dict(zip(keys, values)) for values in itertools.product(*param_lists.values())
+    ]
+
+
+# one price frame per worker process, built from the memory map at startup.
+_worker_prices = pd.DataFrame()
+_worker_cache: Optional[SignalCache] = None
+
+
+def _init_worker(shared: SharedPrices, cache_dir: Optional[str]) -> None:
+    global _worker_prices, _worker_cache
+    _worker_prices = load_shared_prices(shared)
+    _worker_cache = None if cache_dir is None else SignalCache(cache_dir)
+
+
+def _warm_signal(signal: Signal) -> None:
+    if _worker_cache is not None:
+        warm_signal_cache(_worker_prices, _worker_cache, [signal])
+
+
+def _run_grid_point(
+    params: Dict[str, int], bankroll: float, stop_drawdown: Optional[float] = None
+) -> dict:
+    strat = execute_momentum_strategy(
+        _worker_prices,
+        momentum_window=params["momentum_window"],
+        volatility_window=params["volatility_window"],
+        num_stocks=params["num_stocks"],
+        cache=_worker_cache,
+    )
+    backtester = BackTester(
+        strat,
+        bankroll,
+        engine=Engine.array,
+        progress=False,
+        stop_drawdown=stop_drawdown,
+    )
+    return {
+        **params,
+        **backtester.metrics,
+        "final_total": backtester.daily_totals.total.iloc[-1],
+        "stopped_early": backtester.stopped_early,
+    }
+
+
+def _drop_partial_row(results_path: str) -> None:
+    # a crash mid write can leave a last line without its newline.  It is cut
+    # off, so its point is rerun and the next row starts on a line of its own.
+    if not os.path.exists(results_path):
+        return
+    with open(results_path, "rb+") as fout:
+        content = fout.read()
+        if content.endswith(b"\n"):
+            return
+        fout.truncate(content.rfind(b"\n") + 1)
+    if not os.path.getsize(results_path):  # not even the header was written.
+        os.remove(results_path)
+
+
+def _completed_points(results_path: str) -> set:
+    if not os.path.exists(results_path):
+        return set()
+    # metrics may be NaN on purpose, only the parameters must be there.
+    done = pd.read_csv(results_path).dropna(subset=PARAMS)
+    return set(done[PARAMS].astype(int).itertuples(index=False, name=None))
+
+
+def run_sweep(
+    prices: pd.DataFrame,
+    grid: List[Dict[str, int]],
+    results_path: str,
+    bankroll: float = 10000.00,
+    workers: Optional[int] = None,
+    shared_dir: Optional[str] = None,
+    cache_dir: Optional[str] = None,
+    stop_drawdown: Optional[float] = None,
+) -> pd.DataFrame:
+    """
+    Run execute_momentum_strategy + BackTester for every grid point in a pool.
+
+    Prices are written once to memory mapped .npy files that every worker
+    loads at startup, so tasks only pickle their parameters.  Each finished
+    point is appended to the results csv straight away and points already in
+    that csv are skipped, so an interrupted sweep resumes where it stopped.
+
+    With cache_dir, every distinct momentum and volatility signal of the grid
+    is computed once up front into a SignalCache that all grid points read,
+    rather than once per grid point.
+
+    With stop_drawdown, a grid point stops backtesting once its max drawdown
+    reaches it, e.g. 0.5, its metrics cover the days up to the stop and its
+    stopped_early column is set.
+    """
+    _drop_partial_row(results_path)
+    done = _completed_points(results_path)
+    todo = [p for p in grid if tuple(p[k] for k in PARAMS) not in done]
+    shared = share_prices(
+        prices, shared_dir or os.path.splitext(results_path)[0] + "_prices"
+    )
+
+    write_header = not os.path.exists(results_path)
+    # rows appended to an existing csv keep its columns, e.g. one written
+    # before more metrics were added.
+    columns = None if write_header else pd.read_csv(results_path, nrows=0).columns
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(shared, cache_dir)
+    ) as pool:
+        if cache_dir is not None:
+            signals = {("momentum", p["momentum_window"]) for p in todo} | {
+                ("inv_volatility", p["volatility_window"]) for p in todo
+            }
+            list(pool.map(_warm_signal, sorted(signals)))
+        futures = [
+            pool.submit(_run_grid_point, p, bankroll, stop_drawdown) for p in todo
+        ]
+        for future in as_completed(futures):
+            row = pd.DataFrame([future.result()], columns=columns)
+            with open(results_path, "a") as fout:
+                row.to_csv(fout, header=write_header, index=False)
+            write_header = False
+    return pd.read_csv(results_path)
@@ -0,0 +1,249 @@
+"""
+Dense date x symbol layout for the momentum strategy.
+
+Prices are pivoted once into a float matrix with a validity mask and every
+stage after that, ranking, actions and weights, is a 2D array operation.
+to_strategy_frame turns the matrices back into the long strategy frame that
+BackTester reads.
+"""
+from typing import NamedTuple, Optional, Tuple
+import pandas as pd
+import numpy as np
+
+from simple_backtester.actions import Action
+from simple_backtester.engine import StrategyArrays, build_strategy_arrays
+
+# action codes of the action matrix, cells without a strategy row are 0.
+NO_ACTION = 0
+HOLD = Action.hold.value
+SELL = Action.sell.value
+BUY = Action.buy.value
+SKIPPED = -1  # made the top N but a buy was turned down by drawdown protection.
+UNRANKED = np.iinfo(np.int64).max  # rank of every cell outside the top N.
+
+# Action objects by code + 1.
+_ACTIONS = np.array([np.nan, None, Action.hold, Action.sell, Action.buy], dtype=object)
+# columns a sell carried over from the previous day keeps, the rest are NaN.
+_SELL_COLS = ["symbol", "action", "close", "momentum", "inv_volatility", "date"]
+
+
+class PriceMatrix(NamedTuple):
+    dates: pd.DatetimeIndex
+    symbols: pd.Index
+    closes: np.ndarray  # dates x symbols, NaN where a symbol has no row.
+    valid: np.ndarray  # True where the long frame has a row.
+    rows: np.ndarray  # long frame row of every valid cell, -1 elsewhere.
+
+    def take_days(self, days: np.ndarray) -> "PriceMatrix":
+        return PriceMatrix(
+            self.dates[days],
+            self.symbols,
+            self.closes[days],
+            self.valid[days],
+            self.rows[days],
+        )
+
+
+def pivot_prices(df: pd.DataFrame) -> PriceMatrix:
+    date_ids, dates = pd.factorize(df.date, sort=True)
+    symbol_ids, symbols = pd.factorize(df.symbol, sort=True)
+    shape = (len(dates), len(symbols))
+
+    closes = np.full(shape, np.nan)
+    closes[date_ids, symbol_ids] = df.close.values
+    rows = np.full(shape, -1)
+    rows[date_ids, symbol_ids] = np.arange(len(df))
+    valid = rows >= 0
+    if valid.sum() != len(df):
+        raise ValueError("prices hold more than one row for a date and symbol.")
+    return PriceMatrix(pd.DatetimeIndex(dates), symbols, closes, valid, rows)
+
+
+def symbol_columns(prices: PriceMatrix) -> Tuple[np.ndarray, np.ndarray]:
+    # closes of the valid cells one symbol after another, and the position of
+    # every close within its symbol, the layout rolling windows run over.
+    position = np.cumsum(prices.valid, axis=0) - 1
+    return prices.closes.T[prices.valid.T], position.T[prices.valid.T]
+
+
+def from_symbol_columns(prices: PriceMatrix, values: np.ndarray) -> np.ndarray:
+    matrix = np.full(prices.closes.shape, np.nan)
+    matrix.T[prices.valid.T] = values
+    return matrix
+
+
+def to_long(prices: PriceMatrix, matrix: np.ndarray) -> np.ndarray:
+    # one value per long frame row.
+    values = np.empty(prices.valid.sum(), dtype=matrix.dtype)
+    values[prices.rows[prices.valid]] = matrix[prices.valid]
+    return values
+
+
+def from_long(prices: PriceMatrix, values: np.ndarray) -> np.ndarray:
+    # a long frame column as a date x symbol matrix, NaN where there is no row.
+    matrix = np.full(prices.closes.shape, np.nan)
+    matrix[prices.valid] = values[prices.rows[prices.valid]]
+    return matrix
+
+
+def top_ranks(
+    momentum: np.ndarray, eligible: np.ndarray, rows: np.ndarray, num_stocks: int
+) -> np.ndarray:
+    """
+    Rank of the top num_stocks eligible names of every day, 0 being the best.
+
+    Every other cell is UNRANKED.  argpartition
+    picks the top N without sorting the whole day, ties go to the earlier
+    long frame row.
+    """
+    num_days, num_symbols = momentum.shape
+    ranks = np.full(momentum.shape, UNRANKED)
+    num_top = min(num_stocks, num_symbols)
+    if num_top == 0:
+        return ranks
+
+    key = np.where(eligible, -momentum, np.inf)
+    top = np.argpartition(key, num_top - 1, axis=1)[:, :num_top]
+    top_keys = np.take_along_axis(key, top, axis=1)
+    # argpartition breaks ties at the cut off arbitrarily, days where a tied
+    # name was left out are ranked with a full sort instead.
+    cut_off = top_keys.max(axis=1, keepdims=True)
+    tied = (key == cut_off).sum(axis=1) > (top_keys == cut_off).sum(axis=1)
+    tied &= np.isfinite(cut_off[:, 0])
+    top[tied] = np.lexsort((rows[tied], key[tied]), axis=1)[:, :num_top]
+
+    top_keys = np.take_along_axis(key, top, axis=1)
+    top_rows = np.take_along_axis(rows, top, axis=1)
+    top = np.take_along_axis(top, np.lexsort((top_rows, top_keys), axis=1), axis=1)
+    days = np.arange(num_days)[:, None]
+    ranks[days, top] = np.arange(num_top)
+    ranks[~eligible] = UNRANKED
+    return ranks
+
+
+def action_matrix(
+    momentum: np.ndarray,
+    ranks: np.ndarray,
+    num_stocks: int,
+    drawdown_threshold: float,
+    first_held: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Action codes for the top num_stocks names of every day.
+
+    A name held yesterday is held again, or sold when its momentum drops
+    under drawdown_threshold.  Anything else is bought unless it is under the
+    threshold.  The second matrix flags names held yesterday that fell out of
+    the top N, they are sold today at yesterday's close.  first_held are the
+    names held before the first day, none by default.
+    """
+    top = ranks < num_stocks
+    with np.errstate(invalid="ignore"):
+        strong = momentum >= drawdown_threshold
+    held = top & strong
+    held_before = np.zeros_like(held)
+    held_before[1:] = held[:-1]
+    if first_held is not None:
+        held_before[0] = first_held
+
+    actions = np.where(
+        held_before, np.where(strong, HOLD, SELL), np.where(strong, BUY, SKIPPED)
+    )
+    actions[~top] = NO_ACTION
+    return actions.astype(np.int8), held_before & ~top
+
+
+def weight_matrix(
+    inv_volatility: np.ndarray,
+    actions: np.ndarray,
+    max_weight: Optional[float] = None,
+    cash_reserve: float = 0.0,
+) -> np.ndarray:
+    # inverse volatility weights over the names bought or held each day, with
+    # the same constraints as _apply_weights.
+    held = (actions == HOLD) | (actions == BUY)
+    weights = np.where(held, inv_volatility, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        weights = weights / weights.sum(axis=1, keepdims=True)
+    if cash_reserve:
+        weights = weights * (1 - cash_reserve)
+    if max_weight is not None:
+        weights = np.minimum(weights, max_weight)
+    return np.where(held, weights, np.nan)
+
+
+def _strategy_rows(
+    actions: np.ndarray,
+    carried_sells: np.ndarray,
+    ranks: np.ndarray,
+    emitted: np.ndarray,
+) -> Tuple[np.ndarray, ...]:
+    # day, symbol, source day and action code of every strategy row, in the
+    # order of the strategy frame.  A carried over sell reads yesterday.
+    day, symbol = np.nonzero(emitted)
+    sell_day, sell_symbol = np.nonzero(carried_sells)
+
+    days = np.concatenate([sell_day, day])
+    symbols = np.concatenate([sell_symbol, symbol])
+    is_sell = np.arange(len(days)) < len(sell_day)
+    source_days = np.where(is_sell, days - 1, days)
+    order = np.lexsort((ranks[source_days, symbols], ~is_sell, days))
+    codes = np.where(is_sell, SELL, actions[days, symbols])
+    return days[order], symbols[order], source_days[order], codes[order]
+
+
+def to_strategy_frame(
+    df: pd.DataFrame,
+    prices: PriceMatrix,
+    actions: np.ndarray,
+    carried_sells: np.ndarray,
+    ranks: np.ndarray,
+    weights: Optional[np.ndarray] = None,
+    keep_skipped: bool = False,
+) -> pd.DataFrame:
+    """
+    Long strategy frame, one row per action, built in a single construction.
+
+    Every day lists the carried over sells by yesterday's rank and then the
+    top N by rank.  df is the long frame prices was pivoted from.  Skipped
+    buys are kept with a NaN action when keep_skipped is set, and a weight
+    column is added when weights are given.
+    """
+    emitted = actions != NO_ACTION if keep_skipped else actions > NO_ACTION
+    days, symbols, source_days, codes = _strategy_rows(
+        actions, carried_sells, ranks, emitted
+    )
+    is_sell = source_days < days
+
+    frame = df.iloc[prices.rows[source_days, symbols]].reset_index(drop=True)
+    frame["date"] = prices.dates[days]
+    frame["action"] = _ACTIONS[codes + 1]
+    other_cols = [col for col in frame.columns if col not in _SELL_COLS]
+    if other_cols:
+        frame.loc[is_sell, other_cols] = np.nan
+    if weights is not None:
+        frame["weight"] = np.where(is_sell, np.nan, weights[days, symbols])
+    return frame
+
+
+def to_strategy_arrays(
+    prices: PriceMatrix,
+    actions: np.ndarray,
+    carried_sells: np.ndarray,
+    ranks: np.ndarray,
+    weights: np.ndarray,
+) -> StrategyArrays:
+    # the rows of to_strategy_frame without skipped buys, as engine arrays.
+    days, symbols, source_days, codes = _strategy_rows(
+        actions, carried_sells, ranks, actions > NO_ACTION
+    )
+    is_sell = source_days < days
+    return build_strategy_arrays(
+        np.asarray(prices.symbols),
+        prices.dates,
+        symbols,
+        codes,
+        np.where(is_sell, np.nan, weights[days, symbols]),
+        prices.closes[source_days, symbols],
+        days,
+    )
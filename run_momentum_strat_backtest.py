@@ -1,18 +1,12 @@
 from momentum_strategy.momentum_strategy import execute_momentum_strategy
-from simple_backtester.backtester import BackTester
+from simple_backtester.backtester import BackTester, Engine
 import pandas as pd
-import json
 import os
-import pandas_market_calendars as pmc
+from simple_backtester.trading_calendar import TradingCalendar
 
 
 def get_valid_dates(start_date, end_date):
-    valid = (
-        pmc.get_calendar("NYSE")
-        .schedule(start_date=start_date, end_date=end_date)
-        .index
-    )
-    return valid
+    return TradingCalendar.from_exchange(start_date, end_date, exchange="NYSE").dates
 
 
 if __name__ == "__main__":
@@ -28,12 +22,10 @@ if __name__ == "__main__":
         valid_days, momentum_window=14, volatility_window=14, num_stocks=4
     )
     print("Strategy created: Starting backtest.")
-    backtester = BackTester(strat, 10000.00)
+    backtester = BackTester(strat, 10000.00, engine=Engine.array)
     print("Backtest completed: Outputing results.")
     os.makedirs("results", exist_ok=True)
     backtester.data.to_csv("results/backtest.csv", index=False)
     backtester.daily_totals.to_csv("results/totals.csv", index=False)
-
-    with open("results/daily_state.json", "w") as fout:
-        ds = {str(key): val for key, val in backtester.daily_state.items()}
-        json.dump(ds, fout)
+    if backtester.state is not None:
+        backtester.state.save("results/daily_state.npz")
@@ -0,0 +1,25 @@
+from momentum_strategy.sweep import parameter_grid, run_sweep
+from run_momentum_strat_backtest import get_valid_dates
+import pandas as pd
+import os
+
+
+if __name__ == "__main__":
+    print("Importing csv.")
+    all_daily = pd.read_csv("data/nasdaq_backtest.csv")
+    all_daily["date"] = pd.to_datetime(all_daily.date)
+    valid_days = all_daily[
+        all_daily.date.isin(get_valid_dates("2018-01-01", "2021-02-12"))
+    ]
+    print(f"Csv imported. {len(valid_days)} records.")
+
+    grid = parameter_grid(
+        momentum_window=[10, 14, 20, 30],
+        volatility_window=[10, 14, 20],
+        num_stocks=[2, 4, 8],
+    )
+    os.makedirs("results", exist_ok=True)
+    results = run_sweep(
+        valid_days, grid, "results/sweep.csv", cache_dir="results/signal_cache"
+    )
+    print(results.sort_values(by="final_total", ascending=False).head(10))
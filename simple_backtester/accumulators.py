@@ -0,0 +1,83 @@
+from typing import Dict, Optional, Sequence
+import math
+
+from simple_backtester.actions import Action
+from simple_backtester.metrics import TRADING_DAYS
+from simple_backtester.rolling import WindowMoments, _divide, _ratio
+
+BUY = Action.buy.value
+SELL = Action.sell.value
+
+
+class OnlineMetrics:
+    """
+    Streaming metrics of a backtest, updated once per simulated day in O(1).
+
+    The engines update it after every day, so metrics can be read while a run
+    is in progress and a run can be stopped as soon as its drawdown is too
+    deep.  Definitions and rounding follow compute_all, e.g. the peak is only
+    tracked from the first return on.
+    """
+
+    def __init__(self, risk_free_rate: float = 0.02) -> None:
+        self.risk_free_rate = risk_free_rate
+        self.num_days = 0
+        self.first_total: Optional[float] = None
+        self.last_total: Optional[float] = None
+        self.returns = WindowMoments()  # a window that never drops a day.
+        self.downside = 0.0  # sum of the squared negative returns.
+        self.peak = -math.inf
+        self.drawdown = 0.0
+        self.max_drawdown = 0.0
+        self.num_buys = 0
+        self.num_sells = 0
+
+    def update(self, total: float, action_codes: Sequence[int] = ()) -> None:
+        # total at the close of a new day and the Action values of its rows.
+        if self.last_total is None:
+            self.first_total = total
+        else:
+            daily_return = total / self.last_total - 1
+            self.returns.add(daily_return)
+            self.downside += min(daily_return, 0.0) ** 2
+            self.peak = max(self.peak, total)
+            self.drawdown = (total - self.peak) / self.peak
+            self.max_drawdown = min(self.max_drawdown, self.drawdown)
+        self.last_total = total
+        self.num_days += 1
+        for code in action_codes:
+            if code == BUY:
+                self.num_buys += 1
+            elif code == SELL:
+                self.num_sells += 1
+
+    def crossed(self, stop_drawdown: Optional[float]) -> bool:
+        # True once the max drawdown is at least stop_drawdown, e.g. 0.3.
+        return stop_drawdown is not None and self.max_drawdown <= -stop_drawdown
+
+    @property
+    def metrics(self) -> Dict[str, float]:
+        if self.first_total is None or self.last_total is None:
+            return {"num_days": 0}
+        percent_return = (self.last_total - self.first_total) / self.first_total
+        std = self.returns.std()
+        downside_deviation = math.sqrt(self.downside / max(self.returns.count, 1))
+        return {
+            "num_days": self.num_days,
+            "percent_return": round(percent_return, 3),
+            "annual_volatility": round(std * math.sqrt(TRADING_DAYS), 3),
+            "sharpe_ratio": round(
+                _divide(percent_return - self.risk_free_rate, std), 3
+            ),
+            "sortino_ratio": round(
+                _ratio(self.returns.mean * math.sqrt(TRADING_DAYS), downside_deviation),
+                3,
+            ),
+            # like compute_all, there is no drawdown before the first return.
+            "drawdown": round(self.drawdown, 3) if self.returns.count else math.nan,
+            "max_drawdown": (
+                round(self.max_drawdown, 3) if self.returns.count else math.nan
+            ),
+            "num_buys": self.num_buys,
+            "num_sells": self.num_sells,
+        }
@@ -0,0 +1,8 @@
+from enum import Enum, unique
+
+
+@unique
+class Action(Enum):
+    hold = 1
+    sell = 2
+    buy = 3
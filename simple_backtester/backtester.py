@@ -1,20 +1,46 @@
 from typing_extensions import Protocol
-from typing import Dict, Tuple
+from typing import Dict, Mapping, Optional, Tuple, Union
 import pandas as pd
 import numpy as np
 from enum import Enum, unique
-from datetime import timedelta, datetime
+from datetime import datetime
 from copy import deepcopy
 from tqdm import tqdm
 
-from simple_backtester.metrics import annual_return
+from simple_backtester.accumulators import OnlineMetrics
+from simple_backtester.actions import Action
+from simple_backtester.engine import (
+    StrategyArrays,
+    decode_strategy,
+    execute_array_backtest,
+    run_strategy_arrays,
+)
+from simple_backtester.events import DayCloseEvent, EventSink, NullSink, trade_event
+from simple_backtester.metrics import Metric, compute_all
+from simple_backtester.state import DailyStateView, PortfolioState
+from simple_backtester.trading_calendar import TradingCalendar
+
+
+DEPENDENT_COLS = ["symbol", "weight", "action", "date", "close"]
 
 
 @unique
-class Action(Enum):
-    hold = 1
-    sell = 2
-    buy = 3
+class Engine(Enum):
+    pandas = "pandas"  # reference implementation, row by row on the frame.
+    array = "array"
+
+
+class Strategy(Protocol):
+    """
+    Turns prices into the compact arrays the array engine runs.
+
+    BackTester takes StrategyArrays as they are, without validating, sorting
+    or categorizing a strategy frame.  build_strategy_arrays puts rows given in
+    any order into execution order.
+    """
+
+    def arrays(self, prices: pd.DataFrame) -> StrategyArrays:
+        ...
 
 
 def sell(df: pd.DataFrame, i: int, daily_state: dict) -> None:
@@ -39,7 +65,6 @@ def sell(df: pd.DataFrame, i: int, daily_state: dict) -> None:
     daily_state[date]["total"] = (
         daily_state[date]["investments"] + daily_state[date]["cash"]
     )
-    print(f"Selling {symbol}")
 
 
 def buy(df: pd.DataFrame, i: int, daily_state: dict) -> None:
@@ -67,24 +92,36 @@ def buy(df: pd.DataFrame, i: int, daily_state: dict) -> None:
     daily_state[date]["total"] = (
         daily_state[date]["cash"] + daily_state[date]["investments"]
     )
-    print(f"Buying {symbol}")
 
 
-def hold(df: pd.DataFrame, i: int, daily_state: dict) -> None:
+def hold(
+    df: pd.DataFrame, i: int, daily_state: dict, day_total: Optional[float] = None
+) -> None:
     # future upgrade: if the DF is all holds, dont rebalance.
-    _rebalance_position(df, i, daily_state)
+    _rebalance_position(df, i, daily_state, day_total)
+
 
+def _daily_closes(df: pd.DataFrame) -> Dict[str, float]:
+    return dict(zip(df.symbol, df.close))
 
-def _rebalance_position(df: pd.DataFrame, i: int, daily_state: dict) -> None:
-    # calculate an updated total for weighting
+
+def _mark_to_market(day_state: dict, closes: Dict[str, float]) -> float:
+    total = day_state["cash"]
+    for owned_stock, position in day_state["shares_owned"].items():
+        total += closes[owned_stock] * position["num_shares"]
+    return total
+
+
+def _rebalance_position(
+    df: pd.DataFrame, i: int, daily_state: dict, day_total: Optional[float] = None
+) -> None:
+    # calculate an updated total for weighting.  Rebalancing at todays close
+    # moves value between cash and investments, so the total is the same for
+    # every rebalance of the day and can be handed in by the caller.
     date = df.at[i, "date"]
-    total = daily_state[date]["cash"]
-    for owned_stock in daily_state[date]["shares_owned"].keys():
-        owned_stock_df = df.query("symbol == @owned_stock")
-        total += float(
-            owned_stock_df.close.values
-            * daily_state[date]["shares_owned"][owned_stock]["num_shares"]
-        )
+    if day_total is None:
+        day_total = _mark_to_market(daily_state[date], _daily_closes(df))
+    total = day_total
 
     todays_close = df.at[i, "close"]
     symbol = df.at[i, "symbol"]
@@ -114,33 +151,79 @@ def _rebalance_position(df: pd.DataFrame, i: int, daily_state: dict) -> None:
 
 
 class BackTester:
-    def __init__(self, strategy: pd.DataFrame, bankroll: float):
-        dependent_cols = ["symbol", "weight", "action", "date", "close"]
-        for col in dependent_cols:
-            if col not in strategy:
-                print(f"{col} does not exist, cannot execute backtest.")
-                raise (KeyError)
+    def __init__(
+        self,
+        strategy: Union[pd.DataFrame, StrategyArrays],
+        bankroll: float,
+        engine: Optional[Engine] = None,
+        checkpoint_path: Optional[str] = None,
+        checkpoint_every: int = 250,
+        sink: Optional[EventSink] = None,
+        progress: bool = True,
+        stop_drawdown: Optional[float] = None,
+    ):
         self.bankroll = bankroll
-        self.data, self.daily_state = self.execute_backtest(strategy)
+        self.sink = NullSink() if sink is None else sink
+        self.progress = progress
+        if engine is None:
+            # strategy arrays only run on the array engine, frames on pandas.
+            is_arrays = isinstance(strategy, StrategyArrays)
+            engine = Engine.array if is_arrays else Engine.pandas
+        self.engine = engine
+        if checkpoint_path is not None and engine != Engine.array:
+            raise ValueError("checkpointing needs the array engine.")
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_every = checkpoint_every
+        self.state: Optional[PortfolioState] = None  # array engine only.
+        # updated by the engine after every day, readable mid run.  A run ends
+        # early once its max drawdown reaches stop_drawdown, e.g. 0.5.
+        self.online_metrics = OnlineMetrics()
+        self.stop_drawdown = stop_drawdown
+        if isinstance(strategy, StrategyArrays):
+            if engine != Engine.array:
+                raise ValueError("strategy arrays need the array engine.")
+            self.data, self.daily_state = self.execute_arrays(strategy)
+        else:
+            for col in DEPENDENT_COLS:
+                if col not in strategy:
+                    raise KeyError(f"{col} does not exist, cannot execute backtest.")
+            self.data, self.daily_state = self.execute_backtest(strategy)
         self.metrics = self.calculate_metrics(self.daily_state)
+        self.stopped_early = self.online_metrics.crossed(stop_drawdown)
         # self.ledger = init_ledger()  TODO
         # create a ledger class that holds all the accounting details
         # for every transaction.
 
-    def init_execution_cols(self, strat_df: pd.DataFrame) -> None:
+    @staticmethod
+    def init_execution_cols(strat_df: pd.DataFrame) -> None:
         strat_df["action"] = pd.Categorical(
             strat_df["action"], [a for a in Action], ordered=True
         )
-        strat_df["value"] = 0
+        strat_df["value"] = 0.0  # trade values keep their cents.
         strat_df["num_shares"] = 0
         strat_df.sort_values(by=["date", "action"], inplace=True)
         strat_df.reset_index(drop=True, inplace=True)
 
     def execute_backtest(
         self, strat_df: pd.DataFrame
-    ) -> Tuple[pd.DataFrame, Dict[datetime, dict]]:
+    ) -> Tuple[pd.DataFrame, Mapping[datetime, dict]]:
         self.init_execution_cols(strat_df)
-        action_map = {Action.sell: sell, Action.buy: buy, Action.hold: hold}
+        self.calendar = TradingCalendar(strat_df.date)
+        if self.engine == Engine.array:
+            strat_df, self.state = execute_array_backtest(
+                strat_df,
+                self.bankroll,
+                self.checkpoint_path,
+                self.checkpoint_every,
+                self.sink,
+                self.progress,
+                self.online_metrics,
+                self.stop_drawdown,
+            )
+            self.sink.close()
+            return strat_df, DailyStateView(self.state)
+
+        action_map = {Action.sell: sell, Action.buy: buy}
 
         daily_state: Dict[pd.datetime, dict] = {
             strat_df.at[0, "date"]: {
@@ -151,51 +234,100 @@ class BackTester:
             }
         }
 
-        daily_actions_df = pd.DataFrame()
-        for day, df in tqdm(strat_df.groupby("date"), desc="Daily Backtest"):
-            _seed_today(
-                day=day, strat_df=strat_df, today_df=df, daily_state=daily_state
-            )
+        daily_actions = []
+        emit = self.sink.active
+        for day, df in tqdm(
+            strat_df.groupby("date"), desc="Daily Backtest", disable=not self.progress
+        ):
+            if day != self.calendar[0]:
+                _seed_today(
+                    day=day,
+                    previous_day=self.calendar.previous(day),
+                    today_df=df,
+                    daily_state=daily_state,
+                )
+            day_total = _mark_to_market(daily_state[day], _daily_closes(df))
             for i, row in df.iterrows():
-                action_map[row.action](df, i, daily_state)
-
-            daily_actions_df = pd.concat([daily_actions_df, df]).reset_index(drop=True)
-
-        return daily_actions_df, daily_state
-
-    def calculate_metrics(self, daily_state: Dict[datetime, dict]) -> Dict[str, float]:
-        df = pd.DataFrame()
-        for key, day_dict in daily_state.items():
-            day_df = pd.DataFrame([{"datetime": key, "total": day_dict["total"]}])
-            df = pd.concat([df, day_df])
+                if row.action == Action.hold:
+                    hold(df, i, daily_state, day_total)
+                else:
+                    action_map[row.action](df, i, daily_state)
+                if emit:
+                    self.sink.emit(
+                        trade_event(
+                            day,
+                            row.symbol,
+                            row.action,
+                            df.at[i, "num_shares"],
+                            row.close,
+                            df.at[i, "value"],
+                        )
+                    )
+            if emit:
+                self.sink.emit(
+                    DayCloseEvent(
+                        day,
+                        daily_state[day]["cash"],
+                        daily_state[day]["investments"],
+                        daily_state[day]["total"],
+                    )
+                )
+            daily_actions.append(df)
+            self.online_metrics.update(
+                daily_state[day]["total"], [action.value for action in df.action]
+            )
+            if self.online_metrics.crossed(self.stop_drawdown):
+                break
+
+        self.sink.close()
+        return pd.concat(daily_actions).reset_index(drop=True), daily_state
+
+    def execute_arrays(
+        self, arrays: StrategyArrays
+    ) -> Tuple[pd.DataFrame, Mapping[datetime, dict]]:
+        # the array engine straight from a Strategy, data is only assembled
+        # once the run is done.
+        self.calendar = TradingCalendar(arrays.dates)
+        values, num_shares, self.state = run_strategy_arrays(
+            arrays,
+            self.bankroll,
+            self.checkpoint_path,
+            self.checkpoint_every,
+            self.sink,
+            self.progress,
+            self.online_metrics,
+            self.stop_drawdown,
+        )
+        self.sink.close()
+        arrays = arrays.head(len(self.state.dates))
+        return decode_strategy(arrays, values, num_shares), DailyStateView(self.state)
+
+    def calculate_metrics(
+        self, daily_state: Mapping[datetime, dict]
+    ) -> Dict[str, Metric]:
+        if isinstance(daily_state, DailyStateView):  # already columnar.
+            totals = daily_state.state.total
+        else:
+            totals = np.array([day["total"] for day in daily_state.values()])
+        df = pd.DataFrame({"datetime": list(daily_state.keys()), "total": totals})
 
         self.daily_totals = df
-        return {"annual_return": annual_return(df)}
+        return compute_all(df.total.values, df.datetime.values)
 
 
 def _seed_today(
-    *, day: datetime, strat_df: pd.DataFrame, today_df, daily_state: dict
+    *, day: datetime, previous_day: datetime, today_df, daily_state: dict
 ) -> None:
-    if day != strat_df.at[0, "date"]:
-        previous_day = _get_previous_day(day, daily_state)
-        daily_state[day] = deepcopy(daily_state[previous_day])
-        # update closes for the day.
-        todays_investment_total = 0.0
-        for i, row in today_df.iterrows():
-            if row.action != Action.buy:
-                daily_state[day]["shares_owned"][row.symbol]["close"] = row.close
-                todays_investment_total += (
-                    row.close
-                    * daily_state[day]["shares_owned"][row.symbol]["num_shares"]
-                )
-        daily_state[day]["investments"] = todays_investment_total
-        daily_state[day]["total"] = (
-            daily_state[day]["cash"] + daily_state[day]["investments"]
-        )
-
-
-def _get_previous_day(day: datetime, daily_state: dict) -> datetime:
-    for days_before in range(1, 100):  # some impossible range.
-        if day - timedelta(days=days_before) in daily_state:
-            return day - timedelta(days=days_before)
-    return day
+    daily_state[day] = deepcopy(daily_state[previous_day])
+    # update closes for the day.
+    todays_investment_total = 0.0
+    for i, row in today_df.iterrows():
+        if row.action != Action.buy:
+            daily_state[day]["shares_owned"][row.symbol]["close"] = row.close
+            todays_investment_total += (
+                row.close * daily_state[day]["shares_owned"][row.symbol]["num_shares"]
+            )
+    daily_state[day]["investments"] = todays_investment_total
+    daily_state[day]["total"] = (
+        daily_state[day]["cash"] + daily_state[day]["investments"]
+    )
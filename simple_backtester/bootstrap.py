@@ -0,0 +1,108 @@
+"""
+Bootstrap confidence intervals for the metrics of a daily equity curve.
+
+The daily returns of a backtest's daily_totals are resampled in blocks into
+thousands of synthetic equity curves at once.  Each chunk of paths is a
+(days, paths) matrix that compute_all scores in one batched pass.  Blocks
+keep the short range dependence of the returns, e.g. volatility clustering,
+which resampling single days would destroy.
+"""
+from enum import Enum
+from typing import List, NamedTuple, Optional
+import pandas as pd
+import numpy as np
+
+from simple_backtester.metrics import compute_all
+
+
+class Resampling(Enum):
+    stationary = "stationary"  # blocks of geometric length that wrap around.
+    block = "block"  # moving blocks of block_size days.
+
+
+class BootstrapResults(NamedTuple):
+    samples: pd.DataFrame  # metrics of every path, one row each.
+    intervals: pd.DataFrame  # lower, median and upper of every metric.
+
+
+def resample_indices(
+    rng: np.random.Generator,
+    num_returns: int,
+    num_paths: int,
+    block_size: int,
+    resampling: Resampling = Resampling.stationary,
+) -> np.ndarray:
+    # (num_returns, num_paths) positions into the returns, one path per column.
+    days = np.arange(num_returns)[:, None]
+    if resampling == Resampling.block:
+        size = min(block_size, num_returns)
+        num_blocks = -(-num_returns // size)
+        starts = rng.integers(0, num_returns - size + 1, (num_blocks, 1, num_paths))
+        blocks = starts + np.arange(size)[None, :, None]
+        return blocks.reshape(num_blocks * size, num_paths)[:num_returns]
+    # a new block starts on a day with probability 1 / block_size, so block
+    # lengths are geometric with mean block_size.  Every day continues its
+    # block from a random start, counting the days since the block began.
+    new_block = rng.random((num_returns, num_paths)) < 1 / block_size
+    new_block[0] = True
+    block_days = np.maximum.accumulate(np.where(new_block, days, 0), axis=0)
+    starts = rng.integers(0, num_returns, (num_returns, num_paths))
+    block_starts = np.take_along_axis(starts, block_days, axis=0)
+    return (block_starts + days - block_days) % num_returns
+
+
+def bootstrap_paths(
+    returns: np.ndarray, indices: np.ndarray, start: float = 1.0
+) -> np.ndarray:
+    # (days, paths) totals that compound the resampled returns from start.
+    totals = np.empty((len(indices) + 1, indices.shape[1]))
+    totals[0] = start
+    np.cumprod(1 + returns[indices], axis=0, out=totals[1:])
+    totals[1:] *= start
+    return totals
+
+
+def bootstrap_metrics(
+    daily_df: pd.DataFrame,
+    num_paths: int = 1000,
+    block_size: int = 20,
+    resampling: Resampling = Resampling.stationary,
+    seed: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    level: float = 0.95,
+    risk_free_rate: float = 0.02,
+) -> BootstrapResults:
+    """
+    Bootstrap the metrics of a daily totals frame, e.g. BackTester.daily_totals.
+
+    Every path resamples the curve's daily returns and starts from its first
+    total.  The metrics of each path are those of compute_all, annual_return
+    included when the frame has a datetime column.  The intervals hold the
+    central level of every metric across the paths.
+
+    Paths are generated and scored chunk_size at a time, so peak memory stays
+    at a few (days, chunk_size) arrays.  The same seed and chunk_size give the
+    same paths.
+    """
+    totals = daily_df.total.values.astype(np.float64)
+    if len(totals) < 2:
+        raise ValueError("bootstrap needs at least two daily totals.")
+    if block_size < 1:
+        raise ValueError(f"block_size must be at least 1, got {block_size}.")
+    returns = totals[1:] / totals[:-1] - 1
+    dates = daily_df.datetime.values if "datetime" in daily_df else None
+    rng = np.random.default_rng(seed)
+
+    chunks: List[pd.DataFrame] = []
+    chunk_size = chunk_size or num_paths
+    for first_path in range(0, num_paths, chunk_size):
+        size = min(chunk_size, num_paths - first_path)
+        indices = resample_indices(rng, len(returns), size, block_size, resampling)
+        paths = bootstrap_paths(returns, indices, totals[0])
+        chunks.append(pd.DataFrame(compute_all(paths, dates, risk_free_rate)))
+    samples = pd.concat(chunks, ignore_index=True)
+
+    tail = (1 - level) / 2
+    intervals = samples.quantile([tail, 0.5, 1 - tail]).T
+    intervals.columns = ["lower", "median", "upper"]
+    return BootstrapResults(samples, intervals)
@@ -0,0 +1,93 @@
+import os
+import hashlib
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+
+def checksum(*columns: np.ndarray) -> str:
+    digest = hashlib.sha256()
+    for column in columns:
+        column = np.ascontiguousarray(column)
+        digest.update(str(column.dtype).encode())
+        digest.update(column.tobytes())
+    return digest.hexdigest()
+
+
+def save_checkpoint(
+    path: str,
+    strategy_checksum: str,
+    cursor: int,
+    arrays: Dict[str, np.ndarray],
+    rows: Optional[Dict[str, np.ndarray]] = None,
+) -> None:
+    """
+    Write engine state as compressed binary .npz files.
+
+    cursor is the number of days already processed.  arrays are saved whole
+    in path.  rows are the rows added since the checkpoint in path, they go
+    to a file of their own next to it that load_checkpoint appends, so a
+    checkpoint only writes the rows it adds.  Without rows, path holds the
+    whole state and the row files of earlier checkpoints are removed.
+
+    Every file is written next to its path and moved over it, so a crash mid
+    write keeps the last checkpoint.
+    """
+    segments = _segments(path)
+    if rows is not None:
+        _write(f"{path}.{cursor}", **rows)
+        stale: List[int] = []
+        segments.append(cursor)
+    else:
+        stale, segments = segments, []
+    _write(
+        path,
+        strategy_checksum=np.array(strategy_checksum),
+        cursor=np.array(cursor),
+        segments=np.array(segments, dtype=np.int64),
+        **arrays,
+    )
+    for segment in stale:
+        os.remove(f"{path}.{segment}")
+
+
+def load_checkpoint(
+    path: str, strategy_checksum: str
+) -> Optional[Tuple[int, Dict[str, np.ndarray]]]:
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as saved:
+        if str(saved["strategy_checksum"]) != strategy_checksum:
+            raise ValueError(
+                f"{path} was written for a different strategy, remove it to restart."
+            )
+        arrays = {
+            key: saved[key]
+            for key in saved.files
+            if key not in ["strategy_checksum", "cursor", "segments"]
+        }
+        cursor = int(saved["cursor"])
+        segments = saved["segments"].tolist()
+    # rows of later checkpoints follow the ones before them.
+    for segment in segments:
+        with np.load(f"{path}.{segment}") as rows:
+            for key in rows.files:
+                if key in arrays:
+                    arrays[key] = np.concatenate([arrays[key], rows[key]])
+                else:
+                    arrays[key] = rows[key]
+    return cursor, arrays
+
+
+def _segments(path: str) -> List[int]:
+    # days of the row files the checkpoint in path is made of.
+    if not os.path.exists(path):
+        return []
+    with np.load(path) as saved:
+        return saved["segments"].tolist()
+
+
+def _write(path: str, **arrays: np.ndarray) -> None:
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as fout:
+        np.savez_compressed(fout, **arrays)
+    os.replace(tmp_path, path)
@@ -0,0 +1,469 @@
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+import pandas as pd
+import numpy as np
+from tqdm import tqdm
+
+from simple_backtester.accumulators import OnlineMetrics
+from simple_backtester.actions import Action
+from simple_backtester.checkpoint import checksum, load_checkpoint, save_checkpoint
+from simple_backtester.events import DayCloseEvent, EventSink, NullSink, trade_event
+from simple_backtester.state import PortfolioState
+
+HOLD = Action.hold.value
+SELL = Action.sell.value
+BUY = Action.buy.value
+
+
+class StrategyArrays(NamedTuple):
+    """
+    Compact array form of a strategy frame.
+
+    Rows are in execution order (date, then action).  Day d covers rows
+    day_offsets[d]:day_offsets[d + 1].
+    """
+
+    symbols: np.ndarray  # symbol label for every symbol id.
+    dates: pd.DatetimeIndex  # trading date for every day offset.
+    symbol_ids: np.ndarray
+    action_codes: np.ndarray  # Action values.
+    weights: np.ndarray
+    closes: np.ndarray
+    day_offsets: np.ndarray
+
+    def head(self, num_days: int) -> "StrategyArrays":
+        num_rows, stop = self.day_offsets[num_days], num_days + 1
+        return StrategyArrays(
+            self.symbols,
+            self.dates[:num_days],
+            self.symbol_ids[:num_rows],
+            self.action_codes[:num_rows],
+            self.weights[:num_rows],
+            self.closes[:num_rows],
+            self.day_offsets[:stop],
+        )
+
+
+def build_strategy_arrays(
+    symbols: np.ndarray,
+    dates: pd.DatetimeIndex,
+    symbol_ids: np.ndarray,
+    action_codes: np.ndarray,
+    weights: np.ndarray,
+    closes: np.ndarray,
+    day_ids: np.ndarray,
+) -> StrategyArrays:
+    """
+    StrategyArrays from one entry per strategy row, in any row order.
+
+    symbol_ids index symbols and day_ids index the ascending dates.  Rows are
+    put in execution order, keeping their given order within a date and
+    action, and symbols are numbered by first trade like the frame path does.
+    Dates without a row are dropped.
+    """
+    order = np.lexsort((action_codes, day_ids))
+    day_ids = day_ids[order]
+    used_symbols, symbol_ids = np.unique(symbol_ids[order], return_inverse=True)
+    first_trade = np.full(len(used_symbols), len(order))
+    np.minimum.at(first_trade, symbol_ids, np.arange(len(order)))
+    by_first_trade = np.argsort(first_trade)
+    renumber = np.empty(len(used_symbols), dtype=np.int64)
+    renumber[by_first_trade] = np.arange(len(used_symbols))
+
+    used_days = np.unique(day_ids)
+    day_offsets = np.searchsorted(day_ids, used_days)
+    return StrategyArrays(
+        symbols=np.asarray(symbols)[used_symbols[by_first_trade]],
+        dates=pd.DatetimeIndex(dates)[used_days],
+        symbol_ids=renumber[symbol_ids],
+        action_codes=np.asarray(action_codes, dtype=np.int8)[order],
+        weights=np.asarray(weights, dtype=np.float64)[order],
+        closes=np.asarray(closes, dtype=np.float64)[order],
+        day_offsets=np.append(day_offsets, len(order)).astype(np.int64),
+    )
+
+
+def encode_strategy(strat_df: pd.DataFrame) -> StrategyArrays:
+    # ASSUME strat_df has been through BackTester.init_execution_cols.
+    symbol_ids, symbols = pd.factorize(strat_df["symbol"])
+    categories = strat_df["action"].cat.categories
+    action_values = np.array([a.value for a in categories], dtype=np.int8)
+    action_codes = action_values[strat_df["action"].cat.codes.values]
+    day_ids, dates = pd.factorize(strat_df["date"])
+    return build_strategy_arrays(
+        np.asarray(symbols),
+        pd.DatetimeIndex(dates),
+        symbol_ids,
+        action_codes,
+        strat_df["weight"].values,
+        strat_df["close"].values,
+        day_ids,
+    )
+
+
+def decode_strategy(
+    arrays: StrategyArrays, values: np.ndarray, num_shares: np.ndarray
+) -> pd.DataFrame:
+    # the executed strategy frame BackTester.data holds for a frame strategy,
+    # with the whole share counts in an integer column like
+    # init_execution_cols creates.  Action values count up from 1 in category
+    # order.
+    days = np.repeat(np.arange(len(arrays.dates)), np.diff(arrays.day_offsets))
+    return pd.DataFrame(
+        {
+            "symbol": arrays.symbols[arrays.symbol_ids],
+            "weight": arrays.weights,
+            "action": pd.Categorical.from_codes(
+                arrays.action_codes - 1, [a for a in Action], ordered=True
+            ),
+            "date": arrays.dates[days],
+            "close": arrays.closes,
+            "value": values,
+            "num_shares": num_shares.astype(np.int64),
+        }
+    )
+
+
+class Book:
+    """
+    Mutable portfolio state that the array engine steps forward day by day.
+
+    bankroll and weight_scale may be arrays, cash, totals and share counts
+    then carry a trailing scenario axis and every scenario is stepped at once.
+    """
+
+    def __init__(
+        self,
+        bankroll: Union[float, np.ndarray],
+        num_symbols: int,
+        weight_scale: Union[float, np.ndarray] = 1.0,
+    ):
+        self.cash = bankroll
+        self.investments = bankroll * 0.0
+        self.total = bankroll
+        self.weight_scale = weight_scale
+        # NaN when not owned.
+        self.shares = np.full((num_symbols,) + np.shape(bankroll), np.nan)
+        self.closes = np.full(num_symbols, np.nan)
+        # insertion ordered, mirrors the shares_owned dict of the pandas engine
+        # so that totals are summed in the same order.
+        self.held: Dict[int, None] = {}
+
+    def grow(self, num_symbols: int) -> None:
+        # make room for symbols first seen after the book was opened, doubling
+        # so a growing universe costs amortized O(1) per new symbol.
+        if num_symbols > len(self.closes):
+            extra = max(num_symbols, 2 * len(self.closes)) - len(self.closes)
+            self.shares = np.concatenate(
+                [self.shares, np.full((extra,) + self.shares.shape[1:], np.nan)]
+            )
+            self.closes = np.concatenate([self.closes, np.full(extra, np.nan)])
+
+
+def step_day(
+    book: Book,
+    symbol_ids: List[int],
+    action_codes: List[int],
+    weights: List[float],
+    closes: List[float],
+    values: np.ndarray,
+    num_shares: np.ndarray,
+    seed: bool = True,
+) -> None:
+    """
+    Run one trading day of rows through the book.
+
+    Mirrors _seed_today, sell, buy and hold of the pandas engine and writes
+    the per row value and num_shares into the given output slices.  Book
+    attributes are rebound rather than updated in place since, with a scenario
+    axis, they are arrays that may alias each other.
+    """
+    if seed:  # carry yesterday forward at todays closes.
+        todays_investment_total = 0.0
+        for symbol, action, close in zip(symbol_ids, action_codes, closes):
+            if action != BUY:
+                book.closes[symbol] = close
+                todays_investment_total = (
+                    todays_investment_total + close * book.shares[symbol]
+                )
+        book.investments = todays_investment_total
+        book.total = book.cash + book.investments
+
+    # rebalances at todays closes keep the total constant, so it is summed once.
+    day_total = book.cash
+    for owned_symbol in book.held:
+        day_total = day_total + book.closes[owned_symbol] * book.shares[owned_symbol]
+
+    for j, (symbol, action, weight, close) in enumerate(
+        zip(symbol_ids, action_codes, weights, closes)
+    ):
+        if action == SELL:
+            owned = book.shares[symbol]
+            revenue = owned * close
+            values[j] = revenue
+            num_shares[j] = owned
+            book.cash = book.cash + revenue
+            book.investments = book.investments - revenue
+            book.held.pop(symbol)
+            book.shares[symbol] = np.nan
+            book.total = book.investments + book.cash
+        elif action == BUY:
+            bought = book.total * (weight * book.weight_scale) // close
+            book.shares[symbol] = bought
+            book.closes[symbol] = close
+            book.held[symbol] = None
+            value = close * bought
+            book.investments = book.investments + value
+            book.cash = book.cash - value
+            book.total = book.cash + book.investments
+            values[j] = value
+            num_shares[j] = bought
+        else:
+            old_num_shares = book.shares[symbol]
+            old_investment = book.closes[symbol] * old_num_shares
+            new_num_shares = (day_total * (weight * book.weight_scale)) // close
+            book.cash = book.cash - (new_num_shares - old_num_shares) * close
+            book.shares[symbol] = new_num_shares
+            book.closes[symbol] = close
+            book.investments = book.investments + (
+                new_num_shares * close - old_investment
+            )
+            book.total = book.investments + book.cash
+            values[j] = new_num_shares * close
+            num_shares[j] = new_num_shares
+
+
+def record_day(state: PortfolioState, day: int, book: Book) -> None:
+    state.shares[day] = book.shares
+    state.closes[day] = book.closes
+    state.cash[day] = book.cash
+    state.investments[day] = book.investments
+    state.total[day] = book.total
+
+
+def strategy_checksum(arrays: StrategyArrays, bankroll: float) -> str:
+    return checksum(
+        arrays.symbols.astype(str),
+        arrays.dates.values,
+        arrays.symbol_ids,
+        arrays.action_codes,
+        arrays.weights,
+        arrays.closes,
+        np.array(bankroll, dtype=np.float64),
+    )
+
+
+def _book_arrays(book: Book) -> Dict[str, np.ndarray]:
+    return {
+        "cash": np.array(book.cash),
+        "investments": np.array(book.investments),
+        "total": np.array(book.total),
+        "shares": book.shares,
+        "closes": book.closes,
+        "held": np.array(list(book.held), dtype=np.int64),
+    }
+
+
+def _checkpoint_rows(
+    values: np.ndarray,
+    num_shares: np.ndarray,
+    state: PortfolioState,
+    offsets: List[int],
+    first_day: int,
+    cursor: int,
+) -> Dict[str, np.ndarray]:
+    # the rows of the days from first_day up to cursor.
+    start, end = offsets[first_day], offsets[cursor]
+    return {
+        "values": values[start:end],
+        "num_shares": num_shares[start:end],
+        "state_shares": state.shares[first_day:cursor],
+        "state_closes": state.closes[first_day:cursor],
+        "state_cash": state.cash[first_day:cursor],
+        "state_investments": state.investments[first_day:cursor],
+        "state_total": state.total[first_day:cursor],
+    }
+
+
+def _restore_checkpoint(
+    saved: Dict[str, np.ndarray],
+    cursor: int,
+    book: Book,
+    values: np.ndarray,
+    num_shares: np.ndarray,
+    state: PortfolioState,
+) -> None:
+    book.cash = float(saved["cash"])
+    book.investments = float(saved["investments"])
+    book.total = float(saved["total"])
+    book.shares = saved["shares"].copy()
+    book.closes = saved["closes"].copy()
+    book.held = {symbol: None for symbol in saved["held"].tolist()}
+    values[: len(saved["values"])] = saved["values"]
+    num_shares[: len(saved["num_shares"])] = saved["num_shares"]
+    state.shares[:cursor] = saved["state_shares"]
+    state.closes[:cursor] = saved["state_closes"]
+    state.cash[:cursor] = saved["state_cash"]
+    state.investments[:cursor] = saved["state_investments"]
+    state.total[:cursor] = saved["state_total"]
+
+
+def execute_array_backtest(
+    strat_df: pd.DataFrame,
+    bankroll: float,
+    checkpoint_path: Optional[str] = None,
+    checkpoint_every: int = 250,
+    sink: Optional[EventSink] = None,
+    progress: bool = True,
+    metrics: Optional[OnlineMetrics] = None,
+    stop_drawdown: Optional[float] = None,
+) -> Tuple[pd.DataFrame, PortfolioState]:
+    """
+    Array backed equivalent of BackTester.execute_backtest.
+
+    The strategy is converted to arrays once, run by run_strategy_arrays and
+    the value and num_shares columns are assembled at the end.  A run stopped
+    at stop_drawdown returns the rows of the days run.
+    """
+    arrays = encode_strategy(strat_df)
+    values, num_shares, state = run_strategy_arrays(
+        arrays,
+        bankroll,
+        checkpoint_path,
+        checkpoint_every,
+        sink,
+        progress,
+        metrics,
+        stop_drawdown,
+    )
+    num_rows = len(values)
+    if num_rows < len(strat_df):  # stopped early.
+        strat_df = strat_df.iloc[:num_rows].copy()
+    # share counts are whole, they keep the integer column init_execution_cols
+    # creates like the cell by cell writes of the pandas engine.
+    strat_df["value"] = values
+    strat_df["num_shares"] = num_shares.astype(strat_df["num_shares"].dtype)
+    return strat_df, state
+
+
+def run_strategy_arrays(
+    arrays: StrategyArrays,
+    bankroll: float,
+    checkpoint_path: Optional[str] = None,
+    checkpoint_every: int = 250,
+    sink: Optional[EventSink] = None,
+    progress: bool = True,
+    metrics: Optional[OnlineMetrics] = None,
+    stop_drawdown: Optional[float] = None,
+) -> Tuple[np.ndarray, np.ndarray, PortfolioState]:
+    """
+    Simulate a strategy in array form, returning each row's value and
+    num_shares and the daily PortfolioState.
+
+    Every day is a row copy of the book into the PortfolioState and an
+    update of metrics.  With a stop_drawdown the run ends after the first
+    day whose max drawdown reaches it, and only the days run are returned.
+
+    With a checkpoint_path the engine state is saved every checkpoint_every
+    days and a later run on the same strategy and bankroll resumes from the
+    saved day.  Each checkpoint writes the book and the rows since the last
+    one, and a finished run writes the whole state once.  A checkpoint of a
+    different strategy raises ValueError.
+
+    An active sink gets a trade or rebalance event per row and a day close
+    event per day.
+    """
+    symbol_ids = arrays.symbol_ids.tolist()
+    action_codes = arrays.action_codes.tolist()
+    weights = arrays.weights.tolist()
+    closes = arrays.closes.tolist()
+    offsets = arrays.day_offsets.tolist()
+
+    book = Book(bankroll, len(arrays.symbols))
+    values = np.zeros(len(arrays.symbol_ids))
+    num_shares = np.zeros(len(arrays.symbol_ids))
+    state = PortfolioState(arrays.dates, arrays.symbols)
+
+    first_day = 0
+    if checkpoint_path is not None:
+        run_checksum = strategy_checksum(arrays, bankroll)
+        checkpoint = load_checkpoint(checkpoint_path, run_checksum)
+        if checkpoint is not None:
+            first_day, saved = checkpoint
+            _restore_checkpoint(saved, first_day, book, values, num_shares, state)
+    saved_day = first_day  # day of the last checkpoint.
+
+    if metrics is None:
+        metrics = OnlineMetrics()
+    for day in range(first_day):  # days restored from a checkpoint.
+        start, end = offsets[day], offsets[day + 1]
+        metrics.update(state.total[day], action_codes[start:end])
+
+    if sink is None:
+        sink = NullSink()
+    emit = sink.active
+    num_days = len(arrays.dates)
+    for day in tqdm(
+        range(first_day, len(arrays.dates)),
+        desc="Daily Backtest",
+        disable=not progress,
+    ):
+        start, end = offsets[day], offsets[day + 1]
+        step_day(
+            book,
+            symbol_ids[start:end],
+            action_codes[start:end],
+            weights[start:end],
+            closes[start:end],
+            values[start:end],
+            num_shares[start:end],
+            seed=day > 0,
+        )
+        record_day(state, day, book)
+        metrics.update(float(book.total), action_codes[start:end])
+        if emit:
+            date = arrays.dates[day]
+            for j in range(start, end):
+                sink.emit(
+                    trade_event(
+                        date,
+                        arrays.symbols[symbol_ids[j]],
+                        Action(action_codes[j]),
+                        num_shares[j],
+                        closes[j],
+                        values[j],
+                    )
+                )
+            sink.emit(
+                DayCloseEvent(
+                    date, float(book.cash), float(book.investments), float(book.total)
+                )
+            )
+        if checkpoint_path is not None and (day + 1) % checkpoint_every == 0:
+            # the book and only the rows since the last checkpoint.
+            rows = _checkpoint_rows(
+                values, num_shares, state, offsets, saved_day, day + 1
+            )
+            save_checkpoint(
+                checkpoint_path, run_checksum, day + 1, _book_arrays(book), rows
+            )
+            saved_day = day + 1
+        if metrics.crossed(stop_drawdown):
+            num_days = day + 1
+            break
+
+    if checkpoint_path is not None and first_day < num_days == len(arrays.dates):
+        # a finished run leaves one checkpoint of the whole state.
+        save_checkpoint(
+            checkpoint_path,
+            run_checksum,
+            num_days,
+            {
+                **_book_arrays(book),
+                **_checkpoint_rows(values, num_shares, state, offsets, 0, num_days),
+            },
+        )
+
+    if num_days < len(arrays.dates):
+        num_rows = offsets[num_days]
+        return values[:num_rows], num_shares[:num_rows], state.head(num_days)
+    return values, num_shares, state
@@ -0,0 +1,118 @@
+import json
+from collections import deque
+from datetime import datetime
+from typing import Deque, List, NamedTuple, Union
+from typing_extensions import Protocol
+
+from simple_backtester.actions import Action
+
+
+class TradeEvent(NamedTuple):
+    kind: str  # "trade" for buys and sells, "rebalance" for holds.
+    date: datetime
+    symbol: str
+    action: str
+    num_shares: float
+    price: float
+    value: float
+
+
+class DayCloseEvent(NamedTuple):
+    date: datetime
+    cash: float
+    investments: float
+    total: float
+    kind: str = "day_close"
+
+
+Event = Union[TradeEvent, DayCloseEvent]
+
+
+def trade_event(
+    date: datetime,
+    symbol: str,
+    action: Action,
+    num_shares: float,
+    price: float,
+    value: float,
+) -> TradeEvent:
+    return TradeEvent(
+        kind="rebalance" if action == Action.hold else "trade",
+        date=date,
+        symbol=symbol,
+        action=action.name,
+        num_shares=float(num_shares),
+        price=float(price),
+        value=float(value),
+    )
+
+
+class EventSink(Protocol):
+    """
+    Where a backtest sends its trade, rebalance and day close events.
+
+    Engines only build events when active is True, so an inactive sink costs
+    nothing in the backtest loop.
+    """
+
+    active: bool
+
+    def emit(self, event: Event) -> None:
+        ...
+
+    def close(self) -> None:
+        ...
+
+
+class NullSink:
+    active = False
+
+    def emit(self, event: Event) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class RingBufferSink:
+    """Keeps the last capacity events in memory."""
+
+    active = True
+
+    def __init__(self, capacity: int = 10000):
+        self.buffer: Deque[Event] = deque(maxlen=capacity)
+
+    def emit(self, event: Event) -> None:
+        self.buffer.append(event)
+
+    def close(self) -> None:
+        pass
+
+    @property
+    def events(self) -> List[Event]:
+        return list(self.buffer)
+
+
+class FileSink:
+    """Appends events to a newline delimited JSON file in chunks."""
+
+    active = True
+
+    def __init__(self, path: str, chunk_size: int = 1000):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.pending: List[str] = []
+
+    def emit(self, event: Event) -> None:
+        self.pending.append(json.dumps(event._asdict(), default=str))
+        if len(self.pending) >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.pending:
+            with open(self.path, "a") as fout:
+                fout.write("\n".join(self.pending) + "\n")
+            self.pending = []
+
+    def close(self) -> None:
+        self.flush()
@@ -0,0 +1,96 @@
+from typing import Dict, List
+import pandas as pd
+import numpy as np
+from datetime import datetime
+
+from simple_backtester.accumulators import OnlineMetrics
+from simple_backtester.backtester import DEPENDENT_COLS, BackTester
+from simple_backtester.engine import Book, step_day
+from simple_backtester.metrics import Metric, compute_all
+
+
+class IncrementalBackTester:
+    """
+    Backtester that is fed one trading day of strategy rows at a time.
+
+    Made for daily paper trading: on_day costs O(rows + symbols held) and the
+    state, totals and metrics are readable after every day.  Feeding a
+    strategy day by day gives the same results as BackTester on the whole
+    frame.
+    """
+
+    def __init__(self, bankroll: float):
+        self.bankroll = bankroll
+        self.book = Book(bankroll, 0)
+        self.symbol_ids: Dict[str, int] = {}
+        self.symbols: List[str] = []
+        self.daily_state: Dict[datetime, dict] = {}
+        self._dates: List[datetime] = []
+        self._totals: List[float] = []
+        self._daily_actions: List[pd.DataFrame] = []
+        self.online_metrics = OnlineMetrics()
+
+    def on_day(self, day_df: pd.DataFrame) -> dict:
+        for col in DEPENDENT_COLS:
+            if col not in day_df:
+                raise KeyError(f"{col} does not exist, cannot execute backtest.")
+        day = day_df.date.iloc[0]
+        if (day_df.date != day).any():
+            raise ValueError("on_day takes the rows of a single date.")
+        if self._dates and day <= self._dates[-1]:
+            raise ValueError(f"{day} is not after {self._dates[-1]}.")
+
+        df = day_df.copy()
+        BackTester.init_execution_cols(df)
+        for symbol in df.symbol:
+            if symbol not in self.symbol_ids:
+                self.symbol_ids[symbol] = len(self.symbols)
+                self.symbols.append(symbol)
+        self.book.grow(len(self.symbols))
+
+        values = np.zeros(len(df))
+        num_shares = np.zeros(len(df))
+        action_codes = [action.value for action in df.action]
+        step_day(
+            self.book,
+            [self.symbol_ids[symbol] for symbol in df.symbol],
+            action_codes,
+            df.weight.tolist(),
+            df.close.tolist(),
+            values,
+            num_shares,
+            seed=bool(self._dates),
+        )
+        df["value"] = values
+        df["num_shares"] = num_shares.astype(df["num_shares"].dtype)
+
+        self.daily_state[day] = {
+            "cash": self.book.cash,
+            "investments": self.book.investments,
+            "total": self.book.total,
+            "shares_owned": {
+                self.symbols[s]: {
+                    "num_shares": self.book.shares[s],
+                    "close": self.book.closes[s],
+                }
+                for s in self.book.held
+            },
+        }
+        self._dates.append(day)
+        # a single bankroll, the book's totals are plain floats.
+        self._totals.append(float(self.book.total))
+        self.online_metrics.update(self._totals[-1], action_codes)
+        self._daily_actions.append(df)
+        return self.daily_state[day]
+
+    @property
+    def data(self) -> pd.DataFrame:
+        return pd.concat(self._daily_actions).reset_index(drop=True)
+
+    @property
+    def daily_totals(self) -> pd.DataFrame:
+        return pd.DataFrame({"datetime": self._dates, "total": self._totals})
+
+    @property
+    def metrics(self) -> Dict[str, Metric]:
+        return compute_all(np.array(self._totals), pd.DatetimeIndex(self._dates))
@@ -1,14 +1,40 @@
+import warnings
 import pandas as pd
 import numpy as np
-from typing import Tuple
+from contextlib import contextmanager
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Iterator,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
+# every metric takes a daily totals frame, or the totals as an array: a curve
+# of shape (days,) gives a float and a matrix of shape (days, runs) gives one
+# value per run, computed with reductions along the days axis.
+Totals = Union[pd.DataFrame, np.ndarray]
+Metric = Union[float, np.ndarray]
+T = TypeVar("T")
 
-def percent_return(daily_df: pd.DataFrame) -> float:
+
+def percent_return(daily_df: Totals) -> Metric:
+    if isinstance(daily_df, np.ndarray):
+        return _scalar(_percent_return(_as_float(daily_df)))
     df = daily_df.iloc[[0, -1]]
     return (df.iloc[1].total - df.iloc[0].total) / df.iloc[0].total
 
 
-def annual_return(daily_df: pd.DataFrame) -> float:
+def annual_return(daily_df: Totals, dates: Optional[np.ndarray] = None) -> Metric:
+    # the dates of an array of totals are passed separately.
+    if isinstance(daily_df, np.ndarray):
+        if dates is None:
+            raise ValueError("annual_return of an array of totals needs its dates.")
+        return _scalar(_annual_return(_as_float(daily_df), pd.DatetimeIndex(dates)))
     df = daily_df.iloc[[0, -1]]
     months = max(
         (df.iloc[0]["datetime"] - df.iloc[1]["datetime"]) / np.timedelta64(1, "M"), 1
@@ -16,60 +42,313 @@ def annual_return(daily_df: pd.DataFrame) -> float:
     return round(((percent_return(daily_df) + 1) ** (1 / months)) - 1, 2)
 
 
-def cumulative_return(daily_df: pd.DataFrame) -> pd.Series:
+def cumulative_return(daily_df: Totals) -> Union[pd.Series, np.ndarray]:
+    if isinstance(daily_df, np.ndarray):
+        return np.cumprod(1 + _returns(daily_df), axis=0) - 1
     return (1 + daily_df.total.pct_change()[1:]).cumprod() - 1
 
 
-def annual_volitility(daily_df: pd.DataFrame) -> float:
+def annual_volitility(daily_df: Totals) -> Metric:
+    if isinstance(daily_df, np.ndarray):
+        return _batched(
+            lambda returns: _std(returns) * np.sqrt(TRADING_DAYS), _returns(daily_df)
+        )
     trading_days_yr = 252
     return round(daily_df.total.pct_change()[1:].std() * np.sqrt(trading_days_yr), 3)
 
 
-def sharpe_ratio(daily_df: pd.DataFrame, risk_free_rate: float = 0.02) -> float:
+def sharpe_ratio(daily_df: Totals, risk_free_rate: float = 0.02) -> Metric:
     # https://www.investopedia.com/terms/s/sharperatio.asp
     # (return - risk free rate) / std of return
     # not bond investing, so risk-free-rate is 2% (inflation)
+    if isinstance(daily_df, np.ndarray):
+        totals = _as_float(daily_df)
+        return _batched(
+            lambda returns: (_percent_return(totals) - risk_free_rate) / _std(returns),
+            _returns(totals),
+        )
     portfolio_return = percent_return(daily_df)
     std = daily_df.total.pct_change()[1:].std()
     return round((portfolio_return - risk_free_rate) / std, 3)
 
 
-def stability(daily_df: pd.DataFrame) -> float:
+def stability(daily_df: Totals) -> Metric:
+    if isinstance(daily_df, np.ndarray):
+        return _batched(lambda totals: np.std(totals, axis=0, ddof=1), daily_df, 1)
     return round(daily_df.total.std(), 1)
 
 
-def max_drawdown(daily_df: pd.DataFrame) -> Tuple[float, pd.Series]:
+def max_drawdown(daily_df: Totals) -> Tuple[Metric, Union[pd.Series, np.ndarray]]:
+    # the drawdown of an array of totals is an array a day shorter.
+    if isinstance(daily_df, np.ndarray):
+        with _quiet():
+            curve = EquityCurve(daily_df)
+        return _batched(_max_drawdown, curve), curve.drawdown
     wealth_index = 1000 * (1 + daily_df.total.pct_change()[1:]).cumprod()
     drawdown = (wealth_index - wealth_index.cummax()) / wealth_index.cummax()
     return (round(drawdown.min(), 3), drawdown)
 
 
-# TODOS: write these
+TRADING_DAYS = 252
+VAR_CUTOFF = 0.05
+
+
+class _lazy(Generic[T]):
+    # an attribute computed on first use and then stored on the instance.
+    def __init__(self, compute: Callable[[Any], T]):
+        self.compute = compute
+        self.name = compute.__name__
+
+    def __get__(self, instance: Any, owner: Any = None) -> T:
+        value = self.compute(instance)
+        instance.__dict__[self.name] = value
+        return value
+
+
+class EquityCurve:
+    """
+    Intermediates of a daily equity curve that every metric is derived from.
+
+    Returns, log returns, the wealth index, its running max and the drawdown
+    are computed once, so a whole tearsheet costs a handful of passes over the
+    curve instead of a pct_change and cumprod per metric.  Each is computed
+    the first time a metric reads it, so a single metric only pays for its
+    own.  The wealth index starts after the first return, like
+    max_drawdown's.  totals of shape (days, runs) hold one curve per column
+    and every intermediate is reduced along the days axis.
+    """
+
+    def __init__(self, totals: np.ndarray):
+        self.totals = _as_float(totals)
+
+    @_lazy
+    def returns(self) -> np.ndarray:
+        return _returns(self.totals)
+
+    @_lazy
+    def log_returns(self) -> np.ndarray:
+        return np.log1p(self.returns)
+
+    @_lazy
+    def wealth_index(self) -> np.ndarray:
+        return np.cumprod(1 + self.returns, axis=0)
+
+    @_lazy
+    def running_max(self) -> np.ndarray:
+        return np.maximum.accumulate(self.wealth_index, axis=0)
+
+    @_lazy
+    def drawdown(self) -> np.ndarray:
+        return (self.wealth_index - self.running_max) / self.running_max
+
+    # central moments of the returns for volatility, skew and kurtosis.
+    @_lazy
+    def deviations(self) -> np.ndarray:
+        return self.returns - self.returns.mean(axis=0)
+
+    @_lazy
+    def squared(self) -> np.ndarray:
+        return self.deviations * self.deviations
+
+    @_lazy
+    def m2(self) -> np.ndarray:
+        return self.squared.mean(axis=0)
+
+    @_lazy
+    def m3(self) -> np.ndarray:
+        return (self.squared * self.deviations).mean(axis=0)
+
+    @_lazy
+    def m4(self) -> np.ndarray:
+        return (self.squared * self.squared).mean(axis=0)
+
+    @_lazy
+    def std(self) -> np.ndarray:
+        num_returns = len(self.returns)
+        return np.sqrt(self.m2 * num_returns / (num_returns - 1))
+
+    @_lazy
+    def percentiles(self) -> np.ndarray:
+        # 95th and 5th percentile returns for the tail ratio and the VaR_CUTOFF
+        # one, in one pass over the returns.
+        q = [95, 5, 100 * VAR_CUTOFF]
+        if not len(self.returns):
+            return np.full((len(q),) + self.totals.shape[1:], np.nan)
+        return np.percentile(self.returns, q, axis=0)
+
+
+def compute_all(
+    totals: np.ndarray,
+    dates: Optional[np.ndarray] = None,
+    risk_free_rate: float = 0.02,
+) -> Dict[str, Metric]:
+    """
+    The full tearsheet of a daily equity curve in one call.
+
+    totals are the daily portfolio totals, or a (days, runs) matrix of them
+    that gives an array per metric with one value per run.  annual_return is
+    only included when the dates of the totals are given.  Metrics that are
+    undefined for the curve, e.g. ratios over a curve without losses, are NaN.
+    """
+    # a curve of a single day has no returns, its metrics are NaN too.
+    with _quiet():
+        curve = EquityCurve(totals)
+        metrics: Dict[str, Metric] = {}
+        if dates is not None:
+            metrics["annual_return"] = _annual_return(
+                curve.totals, pd.DatetimeIndex(dates)
+            )
+        metrics["percent_return"] = np.round(_percent_return(curve.totals), 3)
+        metrics["annual_volatility"] = np.round(_annual_volatility(curve), 3)
+        metrics["sharpe_ratio"] = np.round(_sharpe(curve, risk_free_rate), 3)
+        metrics["stability"] = np.round(np.std(curve.totals, axis=0, ddof=1), 1)
+        for name, kernel in _KERNELS.items():
+            metrics[name] = np.round(kernel(curve), 3)
+    return {name: _scalar(value) for name, value in metrics.items()}
+
+
+def _percent_return(totals: np.ndarray) -> np.ndarray:
+    return (totals[-1] - totals[0]) / totals[0]
+
+
+def _annual_return(totals: np.ndarray, dates: pd.DatetimeIndex) -> np.ndarray:
+    # same months as annual_return.
+    months = max((dates[0] - dates[-1]) / np.timedelta64(1, "M"), 1)
+    return np.round(((_percent_return(totals) + 1) ** (1 / months)) - 1, 2)
+
+
+def _annual_volatility(curve: EquityCurve) -> np.ndarray:
+    return curve.std * np.sqrt(TRADING_DAYS)
+
+
+def _sharpe(curve: EquityCurve, risk_free_rate: float) -> np.ndarray:
+    # same as sharpe_ratio, total return over the std of daily returns.
+    return (_percent_return(curve.totals) - risk_free_rate) / curve.std
+
+
+def _max_drawdown(curve: EquityCurve) -> np.ndarray:
+    if not len(curve.drawdown):
+        return np.full(curve.totals.shape[1:], np.nan)
+    return curve.drawdown.min(axis=0)
+
+
+def _calmar(curve: EquityCurve) -> np.ndarray:
+    # compound annual growth rate over the deepest drawdown.
+    years = len(curve.returns) / TRADING_DAYS
+    annual_growth = np.exp(curve.log_returns.sum(axis=0) / years) - 1
+    return _ratio(annual_growth, -_max_drawdown(curve))
+
+
+def _omega(curve: EquityCurve, threshold: float = 0.0) -> np.ndarray:
+    # gains over losses around threshold.
+    excess = curve.returns - threshold
+    return _ratio(np.maximum(excess, 0).sum(axis=0), -np.minimum(excess, 0).sum(axis=0))
+
+
+def _sortino(curve: EquityCurve, required_return: float = 0.0) -> np.ndarray:
+    # annualized mean excess return over the annualized downside deviation.
+    excess = curve.returns - required_return
+    downside = np.sqrt(np.mean(np.minimum(excess, 0) ** 2, axis=0))
+    return _ratio(excess.mean(axis=0) * np.sqrt(TRADING_DAYS), downside)
+
+
+def _excess_kurtosis(curve: EquityCurve) -> np.ndarray:
+    return curve.m4 / (curve.m2 * curve.m2) - 3
+
+
+def _skewness(curve: EquityCurve) -> np.ndarray:
+    return curve.m3 / curve.m2 ** 1.5
+
+
+def _tail(curve: EquityCurve) -> np.ndarray:
+    # size of the 95th percentile return over the size of the 5th.
+    right, left = curve.percentiles[:2]
+    return np.abs(right) / np.abs(left)
+
+
+def _value_at_risk(curve: EquityCurve) -> np.ndarray:
+    # historical daily VaR, the return of the worst VAR_CUTOFF of days.
+    return curve.percentiles[2]
+
+
+_KERNELS: Dict[str, Callable[[EquityCurve], np.ndarray]] = {
+    "max_drawdown": _max_drawdown,
+    "calmar_ratio": _calmar,
+    "omega_ratio": _omega,
+    "sortino_ratio": _sortino,
+    "kurtosis": _excess_kurtosis,
+    "skew": _skewness,
+    "tail_ratio": _tail,
+    "daily_value_risk": _value_at_risk,
+}
+
+
+def _as_float(totals: np.ndarray) -> np.ndarray:
+    return np.asarray(totals, dtype=np.float64)
+
+
+def _returns(totals: np.ndarray) -> np.ndarray:
+    totals = _as_float(totals)
+    return totals[1:] / totals[:-1] - 1
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    # NaN over a zero denominator, e.g. the losses of a curve without any.
+    return np.where(denominator == 0, np.nan, numerator / denominator)
+
+
+def _std(returns: np.ndarray) -> np.ndarray:
+    return np.std(returns, axis=0, ddof=1)
+
+
+@contextmanager
+def _quiet() -> Iterator[None]:
+    # silences numpy for metrics that are NaN or inf on purpose.
+    with np.errstate(divide="ignore", invalid="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        yield
+
+
+def _scalar(value: Metric) -> Metric:
+    # a float for a single curve, the array of per run values otherwise.
+    return float(value) if np.ndim(value) == 0 else value
+
+
+def _batched(
+    kernel: Callable[[Any], np.ndarray], arg: Any, decimals: int = 3
+) -> Metric:
+    with _quiet():
+        return _scalar(np.round(kernel(arg), decimals))
+
+
+def _metric(daily_df: Totals, name: str) -> Metric:
+    totals = daily_df if isinstance(daily_df, np.ndarray) else daily_df.total.values
+    return _batched(lambda values: _KERNELS[name](EquityCurve(values)), totals)
 
 
-def _calmar_ratio(daily_df: pd.DataFrame) -> float:
-    return 2
+def _calmar_ratio(daily_df: Totals) -> Metric:
+    return _metric(daily_df, "calmar_ratio")
 
 
-def _omega_ratio(daily_df: pd.DataFrame) -> float:
-    return 2
+def _omega_ratio(daily_df: Totals) -> Metric:
+    return _metric(daily_df, "omega_ratio")
 
 
-def _sortino_ratio(daily_df: pd.DataFrame) -> float:
-    return 2
+def _sortino_ratio(daily_df: Totals) -> Metric:
+    return _metric(daily_df, "sortino_ratio")
 
 
-def _kurtosis(daily_df: pd.DataFrame) -> float:
-    return 2
+def _kurtosis(daily_df: Totals) -> Metric:
+    return _metric(daily_df, "kurtosis")
 
 
-def _skew(daily_df: pd.DataFrame) -> float:
-    return 2
+def _skew(daily_df: Totals) -> Metric:
+    return _metric(daily_df, "skew")
 
 
-def _tail_ratio(daily_df: pd.DataFrame) -> float:
-    return 2
+def _tail_ratio(daily_df: Totals) -> Metric:
+    return _metric(daily_df, "tail_ratio")
 
 
-def _daily_value_risk(daily_df: pd.DataFrame) -> float:
-    return 2
+def _daily_value_risk(daily_df: Totals) -> Metric:
+    return _metric(daily_df, "daily_value_risk")
@@ -0,0 +1,266 @@
+"""
+Rolling risk metrics of a daily equity curve, one linear pass each.
+
+Every function takes a daily totals frame, like the functions of metrics.py,
+and a window of returns.  Day t of the result covers the window returns
+ending on day t, the days before the first full window are NaN.  Windows are
+updated online as a return enters and the oldest leaves, rather than
+recomputing the metric on every slice.
+"""
+from bisect import bisect_left, insort
+from collections import deque
+from typing import Deque, Iterator, List, Optional, Tuple
+import math
+import numpy as np
+import pandas as pd
+
+from simple_backtester.metrics import TRADING_DAYS
+
+
+class WindowMoments:
+    """Welford mean and variance of a sliding window of values."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # sum of squared deviations from the mean.
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def remove(self, value: float) -> None:
+        self.count -= 1
+        if self.count == 0:
+            self.mean, self.m2 = 0.0, 0.0
+            return
+        delta = value - self.mean
+        self.mean -= delta / self.count
+        self.m2 -= delta * (value - self.mean)
+
+    def std(self) -> float:
+        # sample std, like pandas.
+        if self.count < 2:
+            return math.nan
+        return math.sqrt(max(self.m2, 0.0) / (self.count - 1))
+
+
+class WindowQuantile:
+    """
+    Quantiles of a sliding window of values.
+
+    The window is kept sorted, values enter and leave at a bisected position
+    so an update is a binary search plus a short memmove, and any quantile
+    is read in O(1) with np.percentile's linear interpolation.
+    """
+
+    def __init__(self) -> None:
+        self.values: List[float] = []
+
+    def add(self, value: float) -> None:
+        insort(self.values, value)
+
+    def remove(self, value: float) -> None:
+        del self.values[bisect_left(self.values, value)]
+
+    def quantile(self, q: float) -> float:
+        if not self.values:
+            return math.nan
+        position = q * (len(self.values) - 1)
+        low = int(position)
+        high = min(low + 1, len(self.values) - 1)
+        return self.values[low] + (self.values[high] - self.values[low]) * (
+            position - low
+        )
+
+
+def rolling_volatility(daily_df: pd.DataFrame, window: int) -> pd.Series:
+    # annualized std of the window returns, like annual_volitility.
+    rolled = np.full(len(daily_df), np.nan)
+    moments = WindowMoments()
+    for day, entering, leaving in _slide(_returns(daily_df), window):
+        moments.add(entering)
+        if leaving is not None:
+            moments.remove(leaving)
+        if moments.count == window:
+            rolled[day] = moments.std() * math.sqrt(TRADING_DAYS)
+    return _series(daily_df, rolled, "rolling_volatility")
+
+
+def rolling_sharpe(
+    daily_df: pd.DataFrame, window: int, risk_free_rate: float = 0.02
+) -> pd.Series:
+    # like sharpe_ratio, the window's return over the std of its returns.
+    totals = daily_df.total.values.astype(np.float64).tolist()
+    rolled = np.full(len(daily_df), np.nan)
+    moments = WindowMoments()
+    for day, entering, leaving in _slide(_returns(daily_df), window):
+        moments.add(entering)
+        if leaving is not None:
+            moments.remove(leaving)
+        if moments.count == window:
+            window_return = totals[day] / totals[day - window] - 1
+            rolled[day] = _divide(window_return - risk_free_rate, moments.std())
+    return _series(daily_df, rolled, "rolling_sharpe")
+
+
+def rolling_sortino(
+    daily_df: pd.DataFrame, window: int, required_return: float = 0.0
+) -> pd.Series:
+    # annualized mean excess return over the annualized downside deviation.
+    rolled = np.full(len(daily_df), np.nan)
+    moments = WindowMoments()
+    downside = 0.0  # sum of the squared shortfalls in the window.
+    shortfalls = 0  # returns under required_return in the window.
+    for day, entering, leaving in _slide(_returns(daily_df), window):
+        moments.add(entering)
+        if entering < required_return:
+            downside += (entering - required_return) ** 2
+            shortfalls += 1
+        if leaving is not None:
+            moments.remove(leaving)
+            if leaving < required_return:
+                downside -= (leaving - required_return) ** 2
+                shortfalls -= 1
+        if moments.count == window:
+            if not shortfalls:  # no rounding left over from removed shortfalls.
+                downside = 0.0
+            rolled[day] = _ratio(
+                (moments.mean - required_return) * math.sqrt(TRADING_DAYS),
+                math.sqrt(max(downside, 0.0) / window),
+            )
+    return _series(daily_df, rolled, "rolling_sortino")
+
+
+def rolling_drawdown(daily_df: pd.DataFrame, window: int) -> pd.Series:
+    """
+    Drawdown of every day from the highest total of its window.
+
+    A monotonic deque holds the days that can still be the window's peak, in
+    decreasing order of total, so every day enters and leaves it once.
+    """
+    totals = daily_df.total.values.astype(np.float64).tolist()
+    rolled = np.full(len(daily_df), np.nan)
+    peaks: Deque[int] = deque()
+    for day, total in enumerate(totals):
+        while peaks and totals[peaks[-1]] <= total:
+            peaks.pop()
+        peaks.append(day)
+        if peaks[0] <= day - window:  # wealth of a window starts a day in.
+            peaks.popleft()
+        if day >= window:
+            rolled[day] = total / totals[peaks[0]] - 1
+    return _series(daily_df, rolled, "rolling_drawdown")
+
+
+# (max, min, max drawdown) of a run of consecutive totals.
+_Run = Tuple[float, float, float]
+
+
+def _join(first: _Run, second: _Run) -> _Run:
+    # the run of first followed by second, its deepest drop either lies in
+    # one of them or falls from first's peak to second's low.
+    return (
+        max(first[0], second[0]),
+        min(first[1], second[1]),
+        min(first[2], second[2], second[1] / first[0] - 1),
+    )
+
+
+def rolling_max_drawdown(daily_df: pd.DataFrame, window: int) -> pd.Series:
+    """
+    Maximum drawdown of every window, like max_drawdown of the window's slice.
+
+    Max drawdowns of consecutive runs join associatively, so the window is a
+    queue of two stacks of joined runs: totals are pushed on the back, the
+    front is refilled from the back when it runs out, and every total is
+    joined a constant number of times.
+    """
+    totals = daily_df.total.values.astype(np.float64).tolist()
+    rolled = np.full(len(daily_df), np.nan)
+    back: List[float] = []
+    back_run: Optional[_Run] = None
+    front: List[_Run] = []  # front[i] joins front total i and every later one.
+    for day, total in enumerate(totals):
+        back.append(total)
+        back_run = (
+            (total, total, 0.0)
+            if back_run is None
+            else _join(back_run, (total, total, 0.0))
+        )
+        if day < window:
+            continue
+        if not front:  # wealth of a window starts a day in.
+            for value in reversed(back):
+                run = (value, value, 0.0)
+                front.append(_join(run, front[-1]) if front else run)
+            back, back_run = [], None
+        front.pop()
+        if front and back_run is not None:
+            rolled[day] = _join(front[-1], back_run)[2]
+        else:
+            window_run = front[-1] if front else back_run
+            assert window_run is not None  # a full window is in front or back.
+            rolled[day] = window_run[2]
+    return _series(daily_df, rolled, "rolling_max_drawdown")
+
+
+def rolling_value_at_risk(
+    daily_df: pd.DataFrame, window: int, cutoff: float = 0.05
+) -> pd.Series:
+    # historical daily VaR of every window.
+    rolled = np.full(len(daily_df), np.nan)
+    quantiles = WindowQuantile()
+    for day, entering, leaving in _slide(_returns(daily_df), window):
+        quantiles.add(entering)
+        if leaving is not None:
+            quantiles.remove(leaving)
+        if len(quantiles.values) == window:
+            rolled[day] = quantiles.quantile(cutoff)
+    return _series(daily_df, rolled, "rolling_value_at_risk")
+
+
+def rolling_metrics(daily_df: pd.DataFrame, window: int) -> pd.DataFrame:
+    # every rolling metric at default settings, one column each.
+    return pd.concat(
+        [
+            rolling_volatility(daily_df, window),
+            rolling_sharpe(daily_df, window),
+            rolling_sortino(daily_df, window),
+            rolling_drawdown(daily_df, window),
+            rolling_max_drawdown(daily_df, window),
+            rolling_value_at_risk(daily_df, window),
+        ],
+        axis=1,
+    )
+
+
+def _returns(daily_df: pd.DataFrame) -> List[float]:
+    totals = daily_df.total.values.astype(np.float64)
+    return (totals[1:] / totals[:-1] - 1).tolist()
+
+
+def _slide(
+    returns: List[float], window: int
+) -> Iterator[Tuple[int, float, Optional[float]]]:
+    # day of every return, the return and the one leaving the window.
+    for i, entering in enumerate(returns):
+        yield i + 1, entering, returns[i - window] if i >= window else None
+
+
+def _divide(numerator: float, denominator: float) -> float:
+    # float division that follows numpy instead of raising on 0.
+    if denominator == 0:
+        return math.copysign(math.inf, numerator) if numerator else math.nan
+    return numerator / denominator
+
+
+def _ratio(numerator: float, denominator: float) -> float:
+    # like compute_all's ratios, NaN over a zero denominator.
+    return numerator / denominator if denominator else math.nan
+
+
+def _series(daily_df: pd.DataFrame, values: np.ndarray, name: str) -> pd.Series:
+    return pd.Series(values, index=daily_df.index, name=name)
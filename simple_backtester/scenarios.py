@@ -0,0 +1,72 @@
+from typing import NamedTuple, Sequence
+import pandas as pd
+import numpy as np
+from tqdm import tqdm
+
+from simple_backtester.backtester import DEPENDENT_COLS, BackTester
+from simple_backtester.engine import Book, encode_strategy, step_day
+from simple_backtester.metrics import compute_all
+
+
+class Scenario(NamedTuple):
+    bankroll: float
+    weight_scale: float = 1.0  # multiplies every strategy weight.
+    cash_buffer: float = 0.0  # fraction of the total always kept in cash.
+
+
+class ScenarioResults(NamedTuple):
+    equity: pd.DataFrame  # daily total per scenario, one column each.
+    metrics: pd.DataFrame  # one row per scenario, BackTester's metrics.
+
+
+def run_scenarios(
+    strategy: pd.DataFrame, scenarios: Sequence[Scenario], progress: bool = True
+) -> ScenarioResults:
+    """
+    Backtest one strategy under many scenarios in a single pass.
+
+    Sorting, encoding and day indexing are paid once, then the array engine
+    steps a Book whose cash, totals and share counts have a scenario axis.
+    Scenario(bankroll) on its own gives the same totals as
+    BackTester(strategy, bankroll, engine=Engine.array).
+    """
+    for col in DEPENDENT_COLS:
+        if col not in strategy:
+            raise KeyError(f"{col} does not exist, cannot execute backtest.")
+    strat_df = strategy[DEPENDENT_COLS].copy()
+    BackTester.init_execution_cols(strat_df)
+    arrays = encode_strategy(strat_df)
+    symbol_ids = arrays.symbol_ids.tolist()
+    action_codes = arrays.action_codes.tolist()
+    weights = arrays.weights.tolist()
+    closes = arrays.closes.tolist()
+    offsets = arrays.day_offsets.tolist()
+
+    bankrolls = np.array([s.bankroll for s in scenarios], dtype=np.float64)
+    weight_scales = np.array(
+        [s.weight_scale * (1 - s.cash_buffer) for s in scenarios], dtype=np.float64
+    )
+    book = Book(bankrolls, len(arrays.symbols), weight_scales)
+    values = np.zeros((len(strat_df), len(scenarios)))
+    num_shares = np.zeros((len(strat_df), len(scenarios)))
+    totals = np.zeros((len(arrays.dates), len(scenarios)))
+    for day in tqdm(
+        range(len(arrays.dates)), desc="Scenario Backtest", disable=not progress
+    ):
+        start, end = offsets[day], offsets[day + 1]
+        step_day(
+            book,
+            symbol_ids[start:end],
+            action_codes[start:end],
+            weights[start:end],
+            closes[start:end],
+            values[start:end],
+            num_shares[start:end],
+            seed=day > 0,
+        )
+        totals[day] = book.total
+
+    equity = pd.DataFrame(totals, index=arrays.dates.rename("datetime"))
+    metrics = pd.DataFrame(scenarios, columns=Scenario._fields)
+    metrics = metrics.join(pd.DataFrame(compute_all(totals, arrays.dates.values)))
+    return ScenarioResults(equity, metrics)
@@ -0,0 +1,88 @@
+from typing import Iterator, Mapping
+import pandas as pd
+import numpy as np
+from datetime import datetime
+
+from simple_backtester.trading_calendar import TradingCalendar
+
+
+class PortfolioState:
+    """
+    Columnar store of the daily portfolio state.
+
+    Row d of every matrix/vector is the state at the close of dates[d].  Shares
+    and closes are dates x symbols, a NaN share count means the symbol is not
+    owned that day (a zero share count is an owned, empty position).
+    """
+
+    def __init__(self, dates: pd.DatetimeIndex, symbols: np.ndarray):
+        self.dates = dates
+        self.symbols = symbols
+        self.shares = np.full((len(dates), len(symbols)), np.nan)
+        self.closes = np.full((len(dates), len(symbols)), np.nan)
+        self.cash = np.zeros(len(dates))
+        self.investments = np.zeros(len(dates))
+        self.total = np.zeros(len(dates))
+        self.calendar = TradingCalendar(dates)
+
+    def day_dict(self, d: int) -> dict:
+        owned = np.flatnonzero(~np.isnan(self.shares[d]))
+        return {
+            "cash": self.cash[d],
+            "investments": self.investments[d],
+            "total": self.total[d],
+            "shares_owned": {
+                self.symbols[s]: {
+                    "num_shares": self.shares[d, s],
+                    "close": self.closes[d, s],
+                }
+                for s in owned
+            },
+        }
+
+    def head(self, num_days: int) -> "PortfolioState":
+        # the state of the first num_days days, e.g. of a run stopped early.
+        state = PortfolioState(self.dates[:num_days], self.symbols)
+        for name in ["shares", "closes", "cash", "investments", "total"]:
+            setattr(state, name, getattr(self, name)[:num_days])
+        return state
+
+    def save(self, path: str) -> None:
+        np.savez_compressed(
+            path,
+            dates=self.dates.values.astype(np.int64),
+            symbols=self.symbols.astype(str),
+            shares=self.shares,
+            closes=self.closes,
+            cash=self.cash,
+            investments=self.investments,
+            total=self.total,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "PortfolioState":
+        with np.load(path) as saved:
+            state = cls(pd.DatetimeIndex(saved["dates"]), saved["symbols"])
+            for name in ["shares", "closes", "cash", "investments", "total"]:
+                setattr(state, name, saved[name])
+        return state
+
+
+class DailyStateView(Mapping[datetime, dict]):
+    """
+    Read only, lazy daily_state dict on top of a PortfolioState.
+
+    view[date] builds the same nested dict the pandas engine keeps per day.
+    """
+
+    def __init__(self, state: PortfolioState):
+        self.state = state
+
+    def __getitem__(self, day: datetime) -> dict:
+        return self.state.day_dict(self.state.calendar.position(day))
+
+    def __iter__(self) -> Iterator[datetime]:
+        return iter(self.state.dates)
+
+    def __len__(self) -> int:
+        return len(self.state.dates)
@@ -0,0 +1,45 @@
+"""
+Synthetic prices and strategies for tests and benchmarks.
+"""
+import pandas as pd
+import numpy as np
+
+from simple_backtester.actions import Action
+
+
+def random_prices(seed: int, num_days: int, num_symbols: int) -> pd.DataFrame:
+    # long format random walk closes, one row per symbol per business day.
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2000-01-03", periods=num_days)
+    closes = 50 * np.exp(
+        np.cumsum(rng.normal(0.0003, 0.02, (num_days, num_symbols)), 0)
+    )
+    return pd.DataFrame(
+        {
+            "date": np.repeat(dates, num_symbols),
+            "symbol": np.tile([f"S{s}" for s in range(num_symbols)], num_days),
+            "close": np.round(closes, 2).ravel(),
+        }
+    )
+
+
+def random_strategy(
+    seed: int, num_days: int, num_symbols: int, num_stocks: int
+) -> pd.DataFrame:
+    # a valid buy/hold/sell strategy frame picking a random top N every day.
+    rng = np.random.default_rng(seed)
+    prices = random_prices(seed, num_days, num_symbols)
+    closes = prices.close.values.reshape(num_days, num_symbols)
+    dates = prices.date.unique()
+    rows = []
+    held: set = set()
+    for d, date in enumerate(dates):
+        picks = rng.choice(num_symbols, num_stocks, replace=False)
+        weights = rng.dirichlet(np.ones(num_stocks))
+        for s in held - set(picks):
+            rows.append((f"S{s}", date, Action.sell, np.nan, closes[d, s]))
+        for s, weight in zip(picks, weights):
+            action = Action.hold if s in held else Action.buy
+            rows.append((f"S{s}", date, action, weight, closes[d, s]))
+        held = set(picks)
+    return pd.DataFrame(rows, columns=["symbol", "date", "action", "weight", "close"])
@@ -0,0 +1,49 @@
+from typing import Iterable, Iterator
+import pandas as pd
+from datetime import datetime
+
+
+class TradingCalendar:
+    """
+    Ordered trading days with O(1) lookups both ways (position <-> date).
+
+    Build it from the dates a strategy trades on, or from an exchange schedule
+    with from_exchange.  Gaps of any length between trading days are fine,
+    the previous trading day is always one position back.
+    """
+
+    def __init__(self, dates: Iterable[datetime]):
+        self.dates = pd.DatetimeIndex(dates).unique().sort_values()
+        self._positions = {date: i for i, date in enumerate(self.dates)}
+
+    @classmethod
+    def from_exchange(
+        cls, start_date: str, end_date: str, exchange: str = "NYSE"
+    ) -> "TradingCalendar":
+        import pandas_market_calendars as pmc
+
+        schedule = pmc.get_calendar(exchange).schedule(
+            start_date=start_date, end_date=end_date
+        )
+        return cls(schedule.index)
+
+    def position(self, day: datetime) -> int:
+        return self._positions[day]
+
+    def previous(self, day: datetime) -> datetime:
+        position = self._positions[day]
+        if position == 0:
+            raise KeyError(f"{day} is the first trading day.")
+        return self.dates[position - 1]
+
+    def __getitem__(self, position: int) -> datetime:
+        return self.dates[position]
+
+    def __contains__(self, day: object) -> bool:
+        return day in self._positions
+
+    def __iter__(self) -> Iterator[datetime]:
+        return iter(self.dates)
+
+    def __len__(self) -> int:
+        return len(self.dates)
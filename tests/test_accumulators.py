@@ -0,0 +1,71 @@
+import unittest
+import numpy as np
+import pandas as pd
+
+from simple_backtester.accumulators import OnlineMetrics
+from simple_backtester.actions import Action
+from simple_backtester.backtester import BackTester, Engine
+from simple_backtester.engine import encode_strategy
+from simple_backtester.incremental import IncrementalBackTester
+from simple_backtester.metrics import compute_all
+from simple_backtester.synthetic import random_strategy
+
+
+class TestOnlineMetrics(unittest.TestCase):
+    def setUp(self):
+        self.strat = random_strategy(seed=7, num_days=60, num_symbols=10, num_stocks=4)
+
+    def test_matches_compute_all(self):
+        rng = np.random.default_rng(1)
+        totals = 1000 * np.cumprod(1 + rng.normal(0.001, 0.02, 100))
+        online = OnlineMetrics()
+        for total in totals:
+            online.update(total)
+        expected = compute_all(totals)
+        for name in [
+            "percent_return",
+            "annual_volatility",
+            "sharpe_ratio",
+            "sortino_ratio",
+            "max_drawdown",
+        ]:
+            self.assertEqual(online.metrics[name], expected[name], name)
+
+    def test_readable_mid_run(self):
+        backtester = IncrementalBackTester(10000.00)
+        for _, day_df in self.strat.groupby("date"):
+            backtester.on_day(day_df)
+            live = backtester.online_metrics.metrics
+            self.assertEqual(live["num_days"], len(backtester.daily_totals))
+            np.testing.assert_equal(
+                live["max_drawdown"], backtester.metrics["max_drawdown"]
+            )
+        data = backtester.data
+        self.assertEqual(live["num_buys"], (data.action == Action.buy).sum())
+
+    def test_stop_drawdown(self):
+        full = BackTester(self.strat.copy(), 10000.00, engine=Engine.array)
+        self.assertFalse(full.stopped_early)
+        self.assertLess(full.metrics["max_drawdown"], -0.05)
+
+        stopped = BackTester(
+            self.strat.copy(), 10000.00, engine=Engine.array, stop_drawdown=0.05
+        )
+        self.assertTrue(stopped.stopped_early)
+        self.assertLessEqual(stopped.online_metrics.max_drawdown, -0.05)
+        num_days = len(stopped.daily_totals)
+        self.assertLess(num_days, len(full.daily_totals))
+        pd.testing.assert_frame_equal(stopped.data, full.data.iloc[: len(stopped.data)])
+        pd.testing.assert_frame_equal(
+            stopped.daily_totals, full.daily_totals.iloc[:num_days]
+        )
+
+        reference = BackTester(self.strat.copy(), 10000.00, stop_drawdown=0.05)
+        self.assertDictEqual(dict(stopped.daily_state), reference.daily_state)
+
+        strat = self.strat.copy()
+        BackTester.init_execution_cols(strat)
+        from_arrays = BackTester(
+            encode_strategy(strat), 10000.00, engine=Engine.array, stop_drawdown=0.05
+        )
+        self.assertDictEqual(dict(from_arrays.daily_state), reference.daily_state)
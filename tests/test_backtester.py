@@ -1,8 +1,20 @@
+import os
+import tempfile
 import unittest
 import numpy as np
 import pandas as pd
 from copy import deepcopy
-from simple_backtester.backtester import BackTester, Action, _rebalance_position
+from simple_backtester.backtester import (
+    BackTester,
+    Action,
+    Engine,
+    _daily_closes,
+    _mark_to_market,
+    _rebalance_position,
+)
+from simple_backtester.engine import build_strategy_arrays
+from simple_backtester.state import DailyStateView, PortfolioState
+from simple_backtester.synthetic import random_strategy
 
 
 mock_strat = pd.DataFrame(
@@ -88,6 +100,71 @@ class TestBacktester(unittest.TestCase):
         }
         self.assertDictEqual(backtester.daily_state, expected_daily_state)
 
+    def test_long_trading_gap(self):
+        # a halt longer than any day probing window.
+        self.strat.loc[self.strat.date == self.test_date, "date"] = pd.to_datetime(
+            "2021-05-10"
+        )
+        backtester = BackTester(self.strat, 1000.00)
+        self.assertEqual(
+            backtester.daily_state[pd.to_datetime("2021-05-10")]["total"], 2160.0
+        )
+        self.assertEqual(
+            backtester.calendar.previous(pd.to_datetime("2021-05-10")),
+            pd.to_datetime("2020-05-07"),
+        )
+
+    def test_array_engine(self):
+        backtester = BackTester(self.strat, 1000.00, engine=Engine.array)
+        reference = BackTester(mock_strat.copy(), 1000.00)
+        self.assertDictEqual(dict(backtester.daily_state), reference.daily_state)
+        pd.testing.assert_frame_equal(backtester.data, reference.data)
+        np.testing.assert_array_equal(
+            backtester.state.shares, [[60.0, 13.0, np.nan], [np.nan, 34.0, 4.0]]
+        )
+
+    def test_array_engine_matches_reference(self):
+        strat = random_strategy(seed=7, num_days=40, num_symbols=10, num_stocks=4)
+        backtester = BackTester(strat.copy(), 10000.00, engine=Engine.array)
+        reference = BackTester(strat.copy(), 10000.00)
+        self.assertDictEqual(dict(backtester.daily_state), reference.daily_state)
+        pd.testing.assert_frame_equal(backtester.data, reference.data)
+        pd.testing.assert_frame_equal(backtester.daily_totals, reference.daily_totals)
+
+    def test_strategy_arrays(self):
+        strat = random_strategy(seed=8, num_days=30, num_symbols=8, num_stocks=3)
+        reference = BackTester(strat.copy(), 10000.00)
+        # later days first, every day keeps its own row order.
+        strat = strat.sort_values(by="date", ascending=False, kind="mergesort")
+        symbol_ids, symbols = pd.factorize(strat.symbol, sort=True)
+        day_ids, dates = pd.factorize(strat.date, sort=True)
+        arrays = build_strategy_arrays(
+            np.asarray(symbols),
+            pd.DatetimeIndex(dates),
+            symbol_ids,
+            np.array([action.value for action in strat.action]),
+            strat.weight.values,
+            strat.close.values,
+            day_ids,
+        )
+        # strategy arrays pick the array engine unless another one is asked for.
+        backtester = BackTester(arrays, 10000.00)
+        self.assertEqual(backtester.engine, Engine.array)
+        self.assertDictEqual(dict(backtester.daily_state), reference.daily_state)
+        pd.testing.assert_frame_equal(
+            backtester.data, reference.data[backtester.data.columns]
+        )
+        with self.assertRaises(ValueError):
+            BackTester(arrays, 10000.00, engine=Engine.pandas)
+
+    def test_portfolio_state_round_trip(self):
+        backtester = BackTester(self.strat, 1000.00, engine=Engine.array)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "state.npz")
+            backtester.state.save(path)
+            loaded = PortfolioState.load(path)
+        self.assertDictEqual(dict(DailyStateView(loaded)), dict(backtester.daily_state))
+
     def test_rebalancer_buying(self):
         to_rebalance = deepcopy(self.yesterdays_summary)
         rebalanced = {
@@ -106,6 +183,18 @@ class TestBacktester(unittest.TestCase):
         self.assertEqual(self.df.at[1, "value"], 50 * 34)
         self.assertEqual(self.df.at[1, "num_shares"], 34)
 
+    def test_rebalancer_day_total(self):
+        closes = _daily_closes(self.df)
+        self.assertDictEqual(closes, {"A": 25.0, "B": 50.0, "C": 100.0})
+        day_total = _mark_to_market(self.yesterdays_summary[self.test_date], closes)
+        self.assertEqual(day_total, 2160.0)
+
+        to_rebalance = deepcopy(self.yesterdays_summary)
+        expected = deepcopy(self.yesterdays_summary)
+        _rebalance_position(self.df, 1, to_rebalance, day_total)
+        _rebalance_position(self.df, 1, expected)
+        self.assertDictEqual(to_rebalance, expected)
+
     def test_rebalancer_selling(self):
         to_rebalance = deepcopy(self.yesterdays_summary)
         self.df.at[1, "weight"] = 0.20
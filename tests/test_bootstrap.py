@@ -0,0 +1,69 @@
+import unittest
+import numpy as np
+import pandas as pd
+
+from simple_backtester.bootstrap import (
+    Resampling,
+    bootstrap_metrics,
+    resample_indices,
+)
+from simple_backtester.metrics import compute_all
+
+
+class TestBootstrap(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.daily_df = pd.DataFrame(
+            {
+                "datetime": pd.date_range("2020-01-01", periods=250),
+                "total": 1000 * np.cumprod(1 + rng.normal(0.0005, 0.02, 250)),
+            }
+        )
+
+    def test_resample_indices(self):
+        rng = np.random.default_rng(1)
+        blocks = resample_indices(rng, 100, 50, 10, Resampling.block)
+        self.assertEqual(blocks.shape, (100, 50))
+        steps = np.diff(blocks, axis=0)
+        # moving blocks never wrap, they only jump between blocks.
+        self.assertTrue((steps[np.arange(99) % 10 != 9] == 1).all())
+        self.assertTrue(((blocks >= 0) & (blocks < 100)).all())
+
+        stationary = resample_indices(rng, 100, 500, 10)
+        self.assertTrue(((stationary >= 0) & (stationary < 100)).all())
+        continued = np.diff(stationary, axis=0) % 100 == 1
+        # block lengths are geometric with mean block_size.
+        self.assertAlmostEqual(continued.mean(), 0.9, delta=0.01)
+
+    def test_whole_curve_blocks(self):
+        # a single block of every return reproduces the curve on every path.
+        results = bootstrap_metrics(
+            self.daily_df, num_paths=5, block_size=249, resampling=Resampling.block
+        )
+        expected = compute_all(self.daily_df.total.values, self.daily_df.datetime)
+        for name, value in expected.items():
+            np.testing.assert_allclose(results.samples[name], value, err_msg=name)
+
+    def test_bootstrap_metrics(self):
+        results = bootstrap_metrics(self.daily_df, num_paths=400, seed=7)
+        self.assertEqual(len(results.samples), 400)
+        self.assertIn("annual_return", results.samples)
+        intervals = results.intervals.loc[["sharpe_ratio", "max_drawdown"]]
+        self.assertTrue((intervals.lower < intervals["median"]).all())
+        self.assertTrue((intervals["median"] < intervals.upper).all())
+
+        # seeded runs repeat, chunking only bounds how many paths are in memory.
+        pd.testing.assert_frame_equal(
+            bootstrap_metrics(self.daily_df, num_paths=400, seed=7).samples,
+            results.samples,
+        )
+        chunked = bootstrap_metrics(self.daily_df, 400, seed=7, chunk_size=64)
+        self.assertEqual(len(chunked.samples), 400)
+        pd.testing.assert_frame_equal(
+            chunked.samples,
+            bootstrap_metrics(self.daily_df, 400, seed=7, chunk_size=64).samples,
+        )
+
+    def test_too_short(self):
+        with self.assertRaises(ValueError):
+            bootstrap_metrics(self.daily_df.iloc[:1])
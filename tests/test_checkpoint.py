@@ -0,0 +1,76 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import pandas as pd
+from simple_backtester import engine
+from simple_backtester.backtester import BackTester, Engine
+from simple_backtester.synthetic import random_strategy
+
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.strat = random_strategy(seed=2, num_days=40, num_symbols=12, num_stocks=4)
+        self.reference = BackTester(self.strat.copy(), 10000.00, engine=Engine.array)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "backtest.npz")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _backtest(self, strat: pd.DataFrame) -> BackTester:
+        return BackTester(
+            strat,
+            10000.00,
+            engine=Engine.array,
+            checkpoint_path=self.path,
+            checkpoint_every=15,
+        )
+
+    def _crash_on_day(self, crash_day: int) -> mock._patch:
+        record_day = engine.record_day
+
+        def crashing_record_day(state, day, book):
+            if day == crash_day:
+                raise RuntimeError("crashed")
+            record_day(state, day, book)
+
+        return mock.patch.object(engine, "record_day", crashing_record_day)
+
+    def test_resume_skips_processed_days(self):
+        with self._crash_on_day(35), self.assertRaises(RuntimeError):
+            self._backtest(self.strat.copy())
+        # the book, with the rows of days 0 to 15 and 15 to 30 next to it.
+        self.assertEqual(
+            sorted(os.listdir(self.tmp.name)),
+            ["backtest.npz", "backtest.npz.15", "backtest.npz.30"],
+        )
+
+        with mock.patch.object(engine, "step_day", wraps=engine.step_day) as step:
+            resumed = self._backtest(self.strat.copy())
+        # the last checkpoint was written after day 30.
+        self.assertEqual(step.call_count, 10)
+        self.assertDictEqual(
+            dict(resumed.daily_state), dict(self.reference.daily_state)
+        )
+        pd.testing.assert_frame_equal(resumed.data, self.reference.data)
+        pd.testing.assert_frame_equal(resumed.daily_totals, self.reference.daily_totals)
+
+        # the finished run left a single checkpoint of every day.
+        self.assertEqual(os.listdir(self.tmp.name), ["backtest.npz"])
+        with mock.patch.object(engine, "step_day", wraps=engine.step_day) as step:
+            rerun = self._backtest(self.strat.copy())
+        self.assertEqual(step.call_count, 0)
+        pd.testing.assert_frame_equal(rerun.data, self.reference.data)
+        pd.testing.assert_frame_equal(rerun.daily_totals, self.reference.daily_totals)
+
+    def test_stale_checkpoint_is_rejected(self):
+        self._backtest(self.strat.copy())
+        changed = self.strat.copy()
+        changed.loc[5, "close"] += 0.01
+        with self.assertRaises(ValueError):
+            self._backtest(changed)
+
+    def test_needs_array_engine(self):
+        with self.assertRaises(ValueError):
+            BackTester(self.strat.copy(), 10000.00, checkpoint_path=self.path)
@@ -0,0 +1,62 @@
+import os
+import json
+import tempfile
+import unittest
+import pandas as pd
+from simple_backtester.backtester import BackTester, Engine
+from simple_backtester.events import (
+    DayCloseEvent,
+    FileSink,
+    NullSink,
+    RingBufferSink,
+)
+from simple_backtester.synthetic import random_strategy
+
+
+class TestEvents(unittest.TestCase):
+    def setUp(self):
+        self.strat = random_strategy(seed=4, num_days=10, num_symbols=8, num_stocks=3)
+
+    def test_engines_emit_the_same_events(self):
+        sinks = {engine: RingBufferSink() for engine in Engine}
+        for engine, sink in sinks.items():
+            BackTester(
+                self.strat.copy(), 10000.00, engine=engine, sink=sink, progress=False
+            )
+        pandas_events = sinks[Engine.pandas].events
+        array_events = sinks[Engine.array].events
+        self.assertEqual(len(pandas_events), len(self.strat) + 10)
+        self.assertEqual(pandas_events, array_events)
+
+        first_day = [e for e in array_events if e.date == array_events[0].date]
+        self.assertTrue(all(e.action == "buy" for e in first_day[:-1]))
+        self.assertIsInstance(first_day[-1], DayCloseEvent)
+        kinds = {e.kind for e in array_events}
+        self.assertEqual(kinds, {"trade", "rebalance", "day_close"})
+
+    def test_ring_buffer_capacity(self):
+        sink = RingBufferSink(capacity=5)
+        BackTester(self.strat, 10000.00, engine=Engine.array, sink=sink)
+        self.assertEqual(len(sink.events), 5)
+        self.assertIsInstance(sink.events[-1], DayCloseEvent)
+
+    def test_file_sink(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "events.ndjson")
+            sink = FileSink(path, chunk_size=7)
+            backtester = BackTester(
+                self.strat, 10000.00, engine=Engine.array, sink=sink
+            )
+            with open(path) as fin:
+                records = [json.loads(line) for line in fin]
+        self.assertEqual(len(records), len(self.strat) + 10)
+        self.assertEqual(records[-1]["kind"], "day_close")
+        self.assertEqual(records[-1]["total"], backtester.daily_totals.total.iloc[-1])
+        self.assertEqual(
+            pd.to_datetime(records[-1]["date"]),
+            backtester.daily_totals.datetime.iloc[-1],
+        )
+
+    def test_null_sink(self):
+        self.assertFalse(NullSink().active)
+        BackTester(self.strat, 10000.00, sink=NullSink(), progress=False)
@@ -0,0 +1,40 @@
+import unittest
+import pandas as pd
+from simple_backtester.backtester import BackTester, Engine
+from simple_backtester.incremental import IncrementalBackTester
+from simple_backtester.synthetic import random_strategy
+
+
+class TestIncrementalBackTester(unittest.TestCase):
+    def setUp(self):
+        self.strat = random_strategy(seed=11, num_days=40, num_symbols=15, num_stocks=5)
+
+    def test_matches_batch_backtester(self):
+        incremental = IncrementalBackTester(10000.00)
+        for _, day_df in self.strat.groupby("date"):
+            incremental.on_day(day_df)
+        for engine in Engine:
+            backtester = BackTester(self.strat.copy(), 10000.00, engine=engine)
+            self.assertDictEqual(incremental.daily_state, dict(backtester.daily_state))
+            pd.testing.assert_frame_equal(incremental.data, backtester.data)
+            pd.testing.assert_frame_equal(
+                incremental.daily_totals, backtester.daily_totals
+            )
+            self.assertDictEqual(incremental.metrics, backtester.metrics)
+
+    def test_state_is_readable_every_day(self):
+        incremental = IncrementalBackTester(10000.00)
+        days = list(self.strat.groupby("date"))
+        for day, day_df in days[:10]:
+            state = incremental.on_day(day_df)
+            self.assertIs(state, incremental.daily_state[day])
+        self.assertEqual(len(incremental.daily_totals), 10)
+
+    def test_rejects_out_of_order_days(self):
+        incremental = IncrementalBackTester(10000.00)
+        days = [day_df for _, day_df in self.strat.groupby("date")]
+        incremental.on_day(days[0])
+        with self.assertRaises(ValueError):
+            incremental.on_day(days[0])
+        with self.assertRaises(ValueError):
+            incremental.on_day(pd.concat(days[1:3]))
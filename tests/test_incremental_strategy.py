@@ -0,0 +1,39 @@
+import unittest
+import pandas as pd
+
+from momentum_strategy.incremental import IncrementalMomentumStrategy
+from momentum_strategy.momentum_strategy import execute_momentum_strategy
+from simple_backtester.synthetic import random_prices
+
+
+class TestIncrementalMomentumStrategy(unittest.TestCase):
+    def setUp(self):
+        prices = random_prices(seed=7, num_days=120, num_symbols=20)
+        prices = prices.drop(index=[5, 6, 300, 301])  # symbols missing some days.
+        self.prices = prices.reset_index(drop=True)
+
+    def test_matches_full_recompute(self):
+        strategy = IncrementalMomentumStrategy(14, 10, 4, max_weight=0.4)
+        days = [strategy.on_day(day_df) for _, day_df in self.prices.groupby("date")]
+        # no rows until the first windows fill up.
+        self.assertTrue(days[0].empty)
+        incremental = pd.concat([d for d in days if len(d)], ignore_index=True)
+
+        full = execute_momentum_strategy(self.prices, 14, 10, 4, max_weight=0.4)
+        pd.testing.assert_frame_equal(incremental, full)
+
+    def test_emits_only_the_new_day(self):
+        strategy = IncrementalMomentumStrategy(5, 5, 3)
+        for day, day_df in self.prices.groupby("date"):
+            rows = strategy.on_day(day_df)
+            self.assertTrue((rows.date == day).all())
+            self.assertLessEqual(len(rows), 6)  # top 3 plus 3 sells at most.
+
+    def test_rejects_out_of_order_days(self):
+        strategy = IncrementalMomentumStrategy()
+        days = [day_df for _, day_df in self.prices.groupby("date")]
+        strategy.on_day(days[1])
+        with self.assertRaises(ValueError):
+            strategy.on_day(days[0])
+        with self.assertRaises(ValueError):
+            strategy.on_day(pd.concat(days[2:4]))
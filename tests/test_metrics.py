@@ -1,11 +1,23 @@
 import unittest
+from unittest import mock
+import numpy as np
 import pandas as pd
+from scipy import stats
+from simple_backtester.accumulators import OnlineMetrics
 from simple_backtester.metrics import (
+    EquityCurve,
+    _omega,
+    _daily_value_risk,
+    _omega_ratio,
+    _sortino_ratio,
+    _tail_ratio,
+    compute_all,
     cumulative_return,
     annual_return,
     annual_volitility,
     sharpe_ratio,
     max_drawdown,
+    percent_return,
     stability,
 )
 
@@ -47,3 +59,91 @@ class TestMetrics(unittest.TestCase):
     def test_stability(self):
         df = pd.DataFrame({"total": [1, 2, 3, 4, 5, 20]})
         self.assertEqual(stability(df), 7.1)
+
+    def test_compute_all(self):
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame(
+            {
+                "datetime": pd.date_range("2020-01-01", periods=300),
+                "total": 1000 * np.cumprod(1 + rng.normal(0.001, 0.02, 300)),
+            }
+        )
+        metrics = compute_all(df.total.values, df.datetime.values)
+        returns = df.total.pct_change()[1:]
+        self.assertEqual(metrics["annual_return"], annual_return(df))
+        self.assertEqual(metrics["annual_volatility"], annual_volitility(df))
+        self.assertEqual(metrics["sharpe_ratio"], sharpe_ratio(df))
+        self.assertEqual(metrics["stability"], stability(df))
+        self.assertEqual(metrics["max_drawdown"], max_drawdown(df)[0])
+        self.assertEqual(metrics["skew"], round(stats.skew(returns), 3))
+        self.assertEqual(metrics["kurtosis"], round(stats.kurtosis(returns), 3))
+        self.assertNotIn("annual_return", compute_all(df.total.values))
+
+    def test_return_distribution_metrics(self):
+        df = pd.DataFrame({"total": [100, 110, 99, 99, 108.9, 87.12]})
+        # returns 0.1, -0.1, 0, 0.1, -0.2.
+        self.assertEqual(_omega_ratio(df), round(0.2 / 0.3, 3))
+        self.assertEqual(_daily_value_risk(df), -0.18)
+        self.assertEqual(_tail_ratio(df), round(0.1 / 0.18, 3))
+
+    def test_curve_without_losses(self):
+        metrics = compute_all(np.array([100.0, 101, 102, 103, 104, 105]))
+        self.assertEqual(metrics["max_drawdown"], 0)
+        for name in ["calmar_ratio", "omega_ratio", "sortino_ratio"]:
+            self.assertTrue(np.isnan(metrics[name]), name)
+        online = OnlineMetrics()
+        for total in [100.0, 101, 102, 103, 104, 105]:
+            online.update(total)
+        self.assertTrue(np.isnan(online.metrics["sortino_ratio"]))
+
+    def test_lazy_intermediates(self):
+        totals = np.array([100, 110, 99, 99, 108.9, 87.12])
+        # a single metric only computes the intermediates it reads.
+        curve = EquityCurve(totals)
+        _omega(curve)
+        self.assertEqual(set(vars(curve)), {"totals", "returns"})
+        # tail_ratio and daily_value_risk share one percentile pass.
+        with mock.patch("numpy.percentile", wraps=np.percentile) as percentile:
+            compute_all(totals)
+        self.assertEqual(percentile.call_count, 1)
+
+    def test_batched_metrics(self):
+        rng = np.random.default_rng(1)
+        dates = pd.date_range("2020-01-01", periods=200)
+        totals = 1000 * np.cumprod(1 + rng.normal(0.001, 0.02, (200, 5)), axis=0)
+        frames = [pd.DataFrame({"datetime": dates, "total": run}) for run in totals.T]
+        for metric in [
+            percent_return,
+            annual_volitility,
+            sharpe_ratio,
+            stability,
+            _omega_ratio,
+            _sortino_ratio,
+            _tail_ratio,
+        ]:
+            np.testing.assert_allclose(
+                metric(totals), [metric(df) for df in frames], err_msg=metric.__name__
+            )
+        np.testing.assert_allclose(
+            annual_return(totals, dates), [annual_return(df) for df in frames]
+        )
+        np.testing.assert_allclose(
+            cumulative_return(totals)[:, 2], cumulative_return(frames[2])
+        )
+        max_draw_downs, drawdowns = max_drawdown(totals)
+        self.assertEqual(drawdowns.shape, (199, 5))
+        np.testing.assert_allclose(
+            max_draw_downs, [max_drawdown(df)[0] for df in frames]
+        )
+        # one column of the matrix gives the single curve's tearsheet.
+        batched = compute_all(totals, dates)
+        single = compute_all(totals[:, 3], dates)
+        self.assertEqual({k: v[3] for k, v in batched.items()}, single)
+        self.assertEqual(sharpe_ratio(totals[:, 3]), sharpe_ratio(frames[3]))
+
+    def test_batched_metrics_shape(self):
+        # timings are in benchmarks/bench_batched_metrics.py.
+        rng = np.random.default_rng(2)
+        totals = np.cumprod(1 + rng.normal(0.0005, 0.01, (250, 1000)), axis=0)
+        metrics = compute_all(totals)
+        self.assertTrue(all(v.shape == (1000,) for v in metrics.values()))
@@ -1,15 +1,28 @@
 import unittest
+from unittest import mock
 import pandas as pd
 from simple_backtester.backtester import Action
 
+import momentum_strategy.momentum_strategy as momentum_strategy
 from momentum_strategy.momentum_strategy import (
     _momentum_score,
+    _inv_volatility,
     _rolling_groupby,
+    _rolling_momentum,
+    _rolling_inv_volatility,
     _apply_actions,
     _apply_weights,
+    execute_momentum_strategy,
+    execute_wide_momentum_strategy,
+    multi_window_signals,
+    MomentumStrategy,
 )
+from simple_backtester.backtester import BackTester, Engine, Strategy
 
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+from simple_backtester.synthetic import random_prices
 
 
 class TestMomentumStrategy(unittest.TestCase):
@@ -57,6 +70,93 @@ class TestMomentumStrategy(unittest.TestCase):
             pd.Series([np.nan, np.nan, 3.0, np.nan, np.nan, 6.0], name="means"),
         )
 
+    def test_rolling_momentum(self):
+        df = random_prices(seed=3, num_days=600, num_symbols=5)
+        df = df.sample(frac=1, random_state=3)  # not grouped by symbol.
+        df.loc[df.index[10], "close"] = -1.0
+        df.loc[df.index[40], "close"] = np.nan
+        for window in [14, 30, 90]:
+            expected = _rolling_groupby(df, _momentum_score, window).reindex(df.index)
+            pd.testing.assert_series_equal(
+                _rolling_momentum(df, window), expected, check_names=False
+            )
+
+    def test_rolling_inv_volatility(self):
+        df = random_prices(seed=4, num_days=300, num_symbols=5)
+        df = df.sample(frac=1, random_state=4)
+        df.loc[df.index[25], "close"] = np.nan
+        for window in [2, 14, 20]:
+            expected = _rolling_groupby(df, _inv_volatility, window).reindex(df.index)
+            pd.testing.assert_series_equal(
+                _rolling_inv_volatility(df, window), expected, check_names=False
+            )
+
+    def test_multi_window_signals(self):
+        df = random_prices(seed=6, num_days=300, num_symbols=5)
+        df = df.sample(frac=1, random_state=6)
+        df.loc[df.index[30], "close"] = np.nan
+        signals = multi_window_signals(df, [10, 14, 30], [5, 14, 20])
+        self.assertTrue(signals.index.equals(df.index))
+        by_date = df.sort_values(by="date")
+        for window in [10, 14, 30]:
+            expected = _rolling_groupby(by_date, _momentum_score, window)
+            pd.testing.assert_series_equal(
+                signals[f"momentum_{window}"],
+                expected.reindex(df.index),
+                check_names=False,
+            )
+        for window in [5, 14, 20]:
+            expected = _rolling_groupby(by_date, _inv_volatility, window)
+            pd.testing.assert_series_equal(
+                signals[f"inv_volatility_{window}"],
+                expected.reindex(df.index),
+                check_names=False,
+            )
+
+    def test_wide_strategy_matches_long(self):
+        df = random_prices(seed=5, num_days=200, num_symbols=10)
+        df = df.sample(frac=1, random_state=5).reset_index(drop=True)
+        df["volume"] = np.arange(len(df))
+        df = df.drop(index=[3, 4, 100]).reset_index(drop=True)  # a few gaps.
+        pd.testing.assert_frame_equal(
+            execute_wide_momentum_strategy(df.copy(), 14, 14, 3),
+            execute_momentum_strategy(df.copy(), 14, 14, 3),
+        )
+
+    def test_momentum_strategy_arrays(self):
+        df = random_prices(seed=9, num_days=200, num_symbols=12)
+        df = df.sample(frac=1, random_state=9).drop(index=[5, 6, 7])
+        reference = BackTester(
+            execute_momentum_strategy(df.copy(), 14, 14, 4, max_weight=0.3),
+            10000.00,
+            progress=False,
+        )
+        strategy: Strategy = MomentumStrategy(14, 14, 4, max_weight=0.3)
+        backtester = BackTester(
+            strategy.arrays(df), 10000.00, engine=Engine.array, progress=False
+        )
+        self.assertDictEqual(dict(backtester.daily_state), dict(reference.daily_state))
+        pd.testing.assert_frame_equal(
+            backtester.data, reference.data[backtester.data.columns]
+        )
+
+    def test_executor_matches_serial(self):
+        df = random_prices(seed=6, num_days=150, num_symbols=70)
+        serial = execute_momentum_strategy(df, 14, 14, 5)
+        # every input goes to both workers, even on a single CPU.
+        patched = mock.patch.multiple(
+            momentum_strategy, _MIN_PARALLEL_ROWS=0, _num_workers=lambda executor: 2
+        )
+        with patched, ProcessPoolExecutor(2) as executor:
+            parallel = execute_momentum_strategy(df, 14, 14, 5, executor=executor)
+        pd.testing.assert_frame_equal(parallel, serial, check_exact=True)
+
+    def test_small_inputs_skip_the_executor(self):
+        df = random_prices(seed=6, num_days=150, num_symbols=70)
+        executor = mock.Mock(_max_workers=4)
+        execute_momentum_strategy(df, 14, 14, 5, executor=executor)
+        executor.submit.assert_not_called()
+
     def test_apply_actions(self):
         df = pd.DataFrame(
             [  # Test Buys: Buy A and B and weight properly
@@ -168,6 +268,29 @@ class TestMomentumStrategy(unittest.TestCase):
         weights = _apply_weights(df)
         self.assertEqual(round(weights.sum(), 1), 1.0)
 
+    def test_apply_weights_constraints(self):
+        day_1, day_2 = pd.to_datetime("2020-05-07"), pd.to_datetime("2020-05-08")
+        df = pd.DataFrame(
+            [
+                {"inv_volatility": 1, "date": day_1, "action": Action.buy},
+                {"inv_volatility": 3, "date": day_1, "action": Action.buy},
+                {"inv_volatility": 9, "date": day_2, "action": Action.sell},
+                {"inv_volatility": 1, "date": day_2, "action": Action.hold},
+                {"inv_volatility": 1, "date": day_2, "action": Action.buy},
+            ],
+            index=[4, 3, 2, 1, 0],
+        )
+        pd.testing.assert_series_equal(
+            _apply_weights(df),
+            pd.Series([0.25, 0.75, np.nan, 0.5, 0.5], index=df.index),
+            check_names=False,
+        )
+        pd.testing.assert_series_equal(
+            _apply_weights(df, max_weight=0.6, cash_reserve=0.2),
+            pd.Series([0.2, 0.6, np.nan, 0.4, 0.4], index=df.index),
+            check_names=False,
+        )
+
     def test_drawdown(self):
         df = pd.DataFrame(
             [  # Test Buys: Buy A and B and weight properly
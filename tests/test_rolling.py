@@ -0,0 +1,52 @@
+import unittest
+import numpy as np
+import pandas as pd
+
+from simple_backtester.metrics import (
+    EquityCurve,
+    _annual_volatility,
+    _max_drawdown,
+    _sharpe,
+    _sortino,
+    _value_at_risk,
+)
+from simple_backtester.rolling import rolling_metrics
+
+
+class TestRolling(unittest.TestCase):
+    def test_rolling_metrics_match_window_slices(self):
+        rng = np.random.default_rng(0)
+        daily_df = pd.DataFrame(
+            {"total": 1000 * np.cumprod(1 + rng.normal(0.0005, 0.02, 200))}
+        )
+        for window in [2, 5, 30]:
+            rolled = rolling_metrics(daily_df, window)
+            self.assertTrue(rolled.iloc[:window].isna().all(axis=None))
+            expected = []
+            for stop in range(window + 1, len(daily_df) + 1):
+                start = stop - window - 1
+                curve = EquityCurve(daily_df.total.values[start:stop])
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    expected.append(
+                        [
+                            _annual_volatility(curve),
+                            _sharpe(curve, 0.02),
+                            _sortino(curve),
+                            curve.drawdown[-1],
+                            _max_drawdown(curve),
+                            _value_at_risk(curve),
+                        ]
+                    )
+            np.testing.assert_allclose(
+                rolled.values[window:], expected, rtol=1e-9, atol=1e-12
+            )
+
+    def test_rolling_drawdown(self):
+        daily_df = pd.DataFrame({"total": [10, 20, 15, 5, 30, 24, 27]})
+        rolled = rolling_metrics(daily_df, 3)
+        np.testing.assert_allclose(
+            rolled.rolling_drawdown, [np.nan] * 3 + [-0.75, 0, -0.2, -0.1]
+        )
+        np.testing.assert_allclose(
+            rolled.rolling_max_drawdown, [np.nan] * 3 + [-0.75, -2 / 3, -0.2, -0.2]
+        )
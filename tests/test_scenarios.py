@@ -0,0 +1,40 @@
+import unittest
+import pandas as pd
+from simple_backtester.backtester import BackTester, Engine
+from simple_backtester.scenarios import Scenario, run_scenarios
+from simple_backtester.synthetic import random_strategy
+
+
+class TestScenarios(unittest.TestCase):
+    def setUp(self):
+        self.strat = random_strategy(seed=3, num_days=30, num_symbols=12, num_stocks=4)
+
+    def test_matches_single_backtests(self):
+        scenarios = [
+            Scenario(10000.00),
+            Scenario(10000.00, weight_scale=0.5),
+            Scenario(5000.00, cash_buffer=0.1),
+        ]
+        results = run_scenarios(self.strat, scenarios)
+        self.assertEqual(results.equity.shape, (30, 3))
+        self.assertEqual(len(results.metrics), 3)
+
+        for i, (bankroll, weight_scale) in enumerate(
+            [(10000.00, 1.0), (10000.00, 0.5), (5000.00, 0.9)]
+        ):
+            strat = self.strat.copy()
+            strat["weight"] = strat.weight * weight_scale
+            backtester = BackTester(strat, bankroll, engine=Engine.array)
+            pd.testing.assert_series_equal(
+                results.equity[i],
+                backtester.daily_totals.set_index("datetime").total,
+                check_names=False,
+            )
+            self.assertEqual(
+                results.metrics.loc[i, list(backtester.metrics)].to_dict(),
+                backtester.metrics,
+            )
+
+    def test_missing_column(self):
+        with self.assertRaises(KeyError):
+            run_scenarios(self.strat.drop(columns=["weight"]), [Scenario(1000.00)])
@@ -0,0 +1,54 @@
+import os
+import tempfile
+import time
+import unittest
+import pandas as pd
+import numpy as np
+
+from momentum_strategy.momentum_strategy import execute_momentum_strategy
+from momentum_strategy.signal_cache import SignalCache
+from simple_backtester.synthetic import random_prices
+
+
+class TestSignalCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.prices = random_prices(seed=8, num_days=80, num_symbols=8)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_signals_computed_once(self):
+        cache = SignalCache(self.tmp.name)
+        for num_stocks in [2, 3, 4]:
+            cached = execute_momentum_strategy(
+                self.prices, 14, 10, num_stocks, cache=cache
+            )
+            pd.testing.assert_frame_equal(
+                cached, execute_momentum_strategy(self.prices, 14, 10, num_stocks)
+            )
+        self.assertEqual((cache.misses, cache.hits), (2, 4))
+
+        # new prices never read the old entries.
+        changed = self.prices.copy()
+        changed.loc[0, "close"] += 1
+        execute_momentum_strategy(changed, 14, 10, 2, cache=cache)
+        self.assertEqual((cache.misses, cache.hits), (4, 4))
+
+    def test_lru_eviction(self):
+        values = np.zeros(100)
+        entry_size = 100 * 8 + 128  # .npy header
+        cache = SignalCache(self.tmp.name, max_bytes=2 * entry_size)
+        cache.save("prices", "momentum", 10, values)
+        time.sleep(0.01)
+        cache.save("prices", "momentum", 20, values)
+        time.sleep(0.01)
+        cache.load("prices", "momentum", 10)  # 20 is now the oldest.
+        time.sleep(0.01)
+        cache.save("prices", "momentum", 30, values)
+
+        self.assertEqual(
+            sorted(os.listdir(self.tmp.name)),
+            ["momentum_10_prices.npy", "momentum_30_prices.npy"],
+        )
+        self.assertIsNone(cache.load("prices", "momentum", 20))
@@ -0,0 +1,86 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+from momentum_strategy.sweep import (
+    PARAMS,
+    load_shared_prices,
+    parameter_grid,
+    run_sweep,
+    share_prices,
+)
+from simple_backtester.synthetic import random_prices
+
+
+class TestSweep(unittest.TestCase):
+    def setUp(self):
+        self.prices = random_prices(seed=5, num_days=60, num_symbols=6)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.results_path = os.path.join(self.tmp.name, "sweep.csv")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_parameter_grid(self):
+        grid = parameter_grid(momentum_window=[10, 20], num_stocks=[2])
+        self.assertEqual(
+            grid,
+            [
+                {"momentum_window": 10, "num_stocks": 2},
+                {"momentum_window": 20, "num_stocks": 2},
+            ],
+        )
+
+    def test_shared_prices_round_trip(self):
+        shared = share_prices(self.prices, os.path.join(self.tmp.name, "prices"))
+        pd.testing.assert_frame_equal(load_shared_prices(shared), self.prices)
+
+    def test_sweep_resumes(self):
+        grid = parameter_grid(
+            momentum_window=[10, 15], volatility_window=[10], num_stocks=[2]
+        )
+        # pretend the first grid point finished before a crash.
+        pd.DataFrame([{**grid[0], "annual_return": 123.0, "final_total": 1.0}]).to_csv(
+            self.results_path, index=False
+        )
+
+        results = run_sweep(self.prices, grid, self.results_path, workers=2)
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results.at[0, "annual_return"], 123.0)
+        self.assertEqual(results.at[1, "momentum_window"], 15)
+        self.assertGreater(results.at[1, "final_total"], 0)
+
+    def test_sweep_resumes_after_partial_row(self):
+        grid = parameter_grid(
+            momentum_window=[10, 15], volatility_window=[10], num_stocks=[2]
+        )
+        # a finished point with an undefined metric, then a crash mid row.
+        pd.DataFrame([{**grid[0], "annual_return": None, "final_total": 1.0}]).to_csv(
+            self.results_path, index=False
+        )
+        with open(self.results_path, "a") as fout:
+            fout.write("15,10,2,0.3")
+
+        results = run_sweep(self.prices, grid, self.results_path, workers=2)
+        self.assertEqual(results[PARAMS].values.tolist(), [[10, 10, 2], [15, 10, 2]])
+        self.assertEqual(results.at[0, "final_total"], 1.0)
+        self.assertGreater(results.at[1, "final_total"], 0)
+
+    def test_sweep_signal_cache(self):
+        grid = parameter_grid(
+            momentum_window=[10, 15], volatility_window=[10], num_stocks=[2, 3]
+        )
+        cache_dir = os.path.join(self.tmp.name, "signals")
+        cached = run_sweep(
+            self.prices, grid, self.results_path, workers=2, cache_dir=cache_dir
+        )
+        # two momentum windows and one volatility window.
+        self.assertEqual(len(os.listdir(cache_dir)), 3)
+
+        uncached = run_sweep(
+            self.prices, grid, os.path.join(self.tmp.name, "uncached.csv"), workers=2
+        )
+        pd.testing.assert_frame_equal(
+            cached.sort_values(PARAMS).reset_index(drop=True),
+            uncached.sort_values(PARAMS).reset_index(drop=True),
+        )
@@ -0,0 +1,49 @@
+import importlib.util
+import unittest
+import pandas as pd
+from simple_backtester.trading_calendar import TradingCalendar
+
+
+class TestTradingCalendar(unittest.TestCase):
+    def setUp(self):
+        self.calendar = TradingCalendar(
+            pd.to_datetime(["2020-05-11", "2020-05-07", "2020-05-07", "2020-09-01"])
+        )
+
+    def test_ordering(self):
+        self.assertEqual(len(self.calendar), 3)
+        self.assertEqual(self.calendar[0], pd.to_datetime("2020-05-07"))
+        self.assertEqual(self.calendar.position(pd.to_datetime("2020-09-01")), 2)
+        self.assertIn(pd.to_datetime("2020-05-11"), self.calendar)
+        self.assertNotIn(pd.to_datetime("2020-05-08"), self.calendar)
+
+    def test_previous(self):
+        self.assertEqual(
+            self.calendar.previous(pd.to_datetime("2020-09-01")),
+            pd.to_datetime("2020-05-11"),
+        )
+        with self.assertRaises(KeyError):
+            self.calendar.previous(pd.to_datetime("2020-05-07"))
+        with self.assertRaises(KeyError):
+            self.calendar.previous(pd.to_datetime("2020-05-08"))
+
+    @unittest.skipUnless(
+        importlib.util.find_spec("pandas_market_calendars"),
+        "pandas_market_calendars is not installed",
+    )
+    def test_from_exchange(self):
+        calendar = TradingCalendar.from_exchange("2021-01-01", "2021-01-08")
+        self.assertEqual(
+            list(calendar),
+            list(
+                pd.to_datetime(
+                    [
+                        "2021-01-04",
+                        "2021-01-05",
+                        "2021-01-06",
+                        "2021-01-07",
+                        "2021-01-08",
+                    ]
+                )
+            ),
+        )
@@ -0,0 +1,64 @@
+import unittest
+import pandas as pd
+import numpy as np
+
+from momentum_strategy import wide
+
+
+class TestWide(unittest.TestCase):
+    def test_pivot_prices(self):
+        df = pd.DataFrame(
+            {
+                "date": pd.to_datetime(["2020-05-08", "2020-05-07", "2020-05-08"]),
+                "symbol": ["B", "A", "A"],
+                "close": [3.0, 1.0, 2.0],
+            }
+        )
+        prices = wide.pivot_prices(df)
+        np.testing.assert_array_equal(prices.closes, [[1.0, np.nan], [2.0, 3.0]])
+        np.testing.assert_array_equal(prices.rows, [[1, -1], [2, 0]])
+        np.testing.assert_array_equal(wide.to_long(prices, prices.closes), df.close)
+
+        closes, position = wide.symbol_columns(prices)
+        np.testing.assert_array_equal(closes, [1.0, 2.0, 3.0])
+        np.testing.assert_array_equal(position, [0, 1, 0])
+
+        with self.assertRaises(ValueError):
+            wide.pivot_prices(pd.concat([df, df]))
+
+    def test_action_matrix(self):
+        # A and B are bought, then B drops out of the top 2 and C is bought.
+        momentum = np.array([[3.0, 2.0, 1.0], [3.0, -1.0, 1.0], [1.0, -1.0, 2.0]])
+        eligible = np.ones(momentum.shape, dtype=bool)
+        rows = np.arange(momentum.size).reshape(momentum.shape)
+        ranks = wide.top_ranks(momentum, eligible, rows, 2)
+        u = wide.UNRANKED
+        np.testing.assert_array_equal(ranks, [[0, 1, u], [0, u, 1], [1, u, 0]])
+
+        actions, carried_sells = wide.action_matrix(momentum, ranks, 2, 0.2)
+        np.testing.assert_array_equal(
+            actions,
+            [
+                [wide.BUY, wide.BUY, wide.NO_ACTION],
+                [wide.HOLD, wide.NO_ACTION, wide.BUY],
+                [wide.HOLD, wide.NO_ACTION, wide.HOLD],
+            ],
+        )
+        np.testing.assert_array_equal(
+            carried_sells, [[False] * 3, [False, True, False], [False] * 3]
+        )
+
+        weights = wide.weight_matrix(np.array([[1.0, 3.0, 1.0]] * 3), actions)
+        np.testing.assert_array_equal(weights[0], [0.25, 0.75, np.nan])
+
+    def test_top_ranks_ties(self):
+        momentum = np.array([[1.0, 2.0, 2.0, 2.0], [1.0, 2.0, 2.0, 2.0]])
+        eligible = np.array([[True] * 4, [True, True, False, True]])
+        rows = np.array([[3, 2, 1, 0], [0, 1, 2, 3]])
+        u = wide.UNRANKED
+        np.testing.assert_array_equal(
+            wide.top_ranks(momentum, eligible, rows, 2), [[u, u, 1, 0], [u, 0, u, 1]]
+        )
+        np.testing.assert_array_equal(
+            wide.top_ranks(momentum, eligible, rows, 9), [[3, 2, 1, 0], [2, 0, u, 1]]
+        )